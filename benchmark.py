@@ -0,0 +1,505 @@
+"""
+爬虫离线性能基准
+
+在本地启动一个模拟CAB Digital Library的HTTP服务（搜索结果页 + 合成PDF），
+用CABDigitalLibraryCrawler对其执行翻页、解析、保存和下载，报告 页/秒、
+每条结果的解析耗时(微秒)、每条文章记录的常驻内存(字节)、下载MB/秒和峰值内存，并把结果追加到结果文件中，
+便于比较不同版本之间的性能变化。
+
+用法:
+    python benchmark.py --pages 20 --pdf-size-kb 512 --pdf-latency-ms 50
+    python benchmark.py --pages-dir ./recorded_pages   # 使用录制的搜索结果页
+"""
+import argparse
+import dataclasses
+import gc
+import hashlib
+import json
+import logging
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import crawler
+from crawler import CABDigitalLibraryCrawler, PARSER_BACKENDS, SEARCH_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+MONTHS = ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+          'November', 'December')
+
+
+def synthetic_doi(n):
+    return f"10.31220/agriRxiv.2024.{n:05d}"
+
+
+def synthetic_abstract(n):
+    return ' '.join(f"word{(n * 7 + i) % 97}" for i in range(120))
+
+
+def synthetic_item(n):
+    """生成一条与真实搜索结果结构一致的li.search__item"""
+    doi = synthetic_doi(n)
+    date = f"{n % 28 + 1} {MONTHS[n % 12]} {2024 - n // 1000}"
+    abstract = synthetic_abstract(n)
+    return f'''<li class="search__item clearfix">
+  <div class="issue-item">
+    <div class="issue-item__checkbox"><input type="checkbox" name="doi" value="{doi}"/></div>
+    <h4 class="issue-item__title"><a href="/doi/{doi}">Synthetic <i>preprint</i> number {n} on soil health</a></h4>
+    <ul class="rlist--inline loa">
+      <li><a href="/author/Smith%2C+A">Alice   Smith</a></li>
+      <li><a href="/author/Jones%2C+B">Bob Jones</a></li>
+      <li><a href="/author/Li%2C+C">Chen Li</a></li>
+    </ul>
+    <div class="issue-item__detail">
+      <a href="/journal/agrirxiv">agriRxiv</a>
+      <span class="epub-section__date"><span>{date}</span></span>
+    </div>
+    <div class="issue-item__abstract"><span class="hlFld-Abstract">{abstract}</span></div>
+  </div>
+</li>'''
+
+
+def synthetic_search_page(start, total):
+    """生成从偏移start开始的搜索结果页"""
+    items = '\n'.join(synthetic_item(n) for n in range(start, min(start + SEARCH_PAGE_SIZE, total)))
+    next_link = ''
+    if start + SEARCH_PAGE_SIZE < total:
+        next_link = (f'<a class="pagination__btn--next" aria-label="Next page" '
+                     f'href="/action/doSearch?SeriesKey=agrirxiv&startPage={start + SEARCH_PAGE_SIZE}">Next</a>')
+    return f'''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>Search results | CABI Digital Library</title></head>
+<body>
+<div class="search-result__meta"><span class="result__count">{total}</span> results</div>
+<ul class="rlist search-result__body">
+{items}
+</ul>
+<nav class="pagination">{next_link}</nav>
+</body></html>'''
+
+
+def synthetic_ris(doi):
+    """生成与synthetic_item对应的RIS引文记录，包含完整摘要和卷期页码"""
+    n = int(doi.rsplit('.', 1)[1])
+    abstract = synthetic_abstract(n)
+    # 长摘要按真实导出文件的样式折行
+    abstract_lines = textwrap.wrap(abstract, 200)
+    return '\r\n'.join([
+        'TY  - JOUR',
+        f'T1  - Synthetic preprint number {n} on soil health',
+        'AU  - Smith, Alice',
+        'AU  - Jones, Bob',
+        'AU  - Li, Chen',
+        f'Y1  - {2024 - n // 1000}/{n % 12 + 1:02d}/{n % 28 + 1:02d}',
+        f'DO  - {doi}',
+        'JO  - agriRxiv',
+        f'VL  - {2024 - n // 1000}',
+        f'IS  - {n % 12 + 1}',
+        f'SP  - {n * 10 + 1}',
+        f'EP  - {n * 10 + 9}',
+        f'AB  - {abstract_lines[0]}',
+        *abstract_lines[1:],
+        f'UR  - https://www.cabidigitallibrary.org/doi/{doi}',
+        'ER  - ',
+        '',
+    ])
+
+
+def synthetic_pdf(size):
+    """生成指定大小的合成PDF（以%PDF头开始，%%EOF结束）"""
+    header = b'%PDF-1.4\n'
+    trailer = b'\n%%EOF\n'
+    body = bytes(random.Random(size).getrandbits(8) for _ in range(min(size, 4096)))
+    padding = size - len(header) - len(trailer)
+    content = (body * (padding // len(body) + 1))[:max(0, padding)]
+    return header + content + trailer
+
+
+class StandInCABServer:
+    """
+    本地模拟的CAB Digital Library服务
+
+    - /                          主页
+    - /action/doSearch?...       搜索结果页，startPage为结果偏移；指定pages_dir时按顺序返回录制的页面
+    - /doi/pdf/<doi>             合成PDF，大小和响应延迟可配置，支持Range请求
+    - POST /action/downloadCitation  按表单中的多个doi参数返回RIS格式的批量引文导出
+    - POST /v1/chat/completions  模拟OpenAI兼容的对话接口，按请求中的DOI返回固定的分类和总结；
+                                 chat_failures不为0时先返回相应次数的429
+    """
+
+    def __init__(self, total_results=200, pdf_size=256 * 1024, pdf_latency=0.0, page_latency=0.0,
+                 pages_dir=None):
+        self.total_results = total_results
+        self.pdf = synthetic_pdf(pdf_size)
+        self.pdf_etag = f'"{hashlib.sha256(self.pdf).hexdigest()[:16]}"'
+        self.pdf_latency = pdf_latency
+        self.page_latency = page_latency
+        self.recorded_pages = []
+        if pages_dir:
+            self.recorded_pages = [p.read_bytes() for p in sorted(Path(pages_dir).glob('*.html'))]
+        self.routes = []
+        self.chat_requests = 0
+        self.citation_requests = 0
+        self.chat_failures = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self):
+        return f"{self.base_url}/action/doSearch?SeriesKey=agrirxiv&startPage=0&sortBy=EPubDate"
+
+    def add_route(self, prefix, handler):
+        """注册额外的路由，handler(request_handler, parsed_url)负责写出响应，POST请求体在request_handler.body中"""
+        self.routes.append((prefix, handler))
+
+    def search_page(self, start):
+        if self.recorded_pages:
+            index = start // SEARCH_PAGE_SIZE
+            return self.recorded_pages[index] if index < len(self.recorded_pages) else b'<html><body></body></html>'
+        return synthetic_search_page(start, self.total_results).encode('utf-8')
+
+    def chat_completion(self, request):
+        """按OpenAI chat.completion格式回复：对用户消息中的每个DOI给出分类和摘要首句"""
+        items = json.loads(request['messages'][-1]['content'])
+        results = [{'doi': item['doi'], 'category': 'Soil science',
+                    'summary': ' '.join(item.get('abstract', '').split()[:12])} for item in items]
+        content = json.dumps({'results': results})
+        prompt_tokens = sum(len(message['content'].split()) for message in request['messages'])
+        completion_tokens = len(content.split())
+        return {
+            'id': f"chatcmpl-{self.chat_requests}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'mock'),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                for prefix, handler in server.routes:
+                    if url.path.startswith(prefix):
+                        return handler(self, url)
+                if url.path.startswith('/action/doSearch'):
+                    if server.page_latency:
+                        time.sleep(server.page_latency)
+                    start = int(parse_qs(url.query).get('startPage', ['0'])[0])
+                    return self.send_body(server.search_page(start), 'text/html; charset=utf-8')
+                if url.path.startswith('/doi/pdf/'):
+                    if server.pdf_latency:
+                        time.sleep(server.pdf_latency)
+                    return self.send_body(server.pdf, 'application/pdf', allow_range=True, etag=server.pdf_etag)
+                if url.path == '/':
+                    return self.send_body(b'<html><head><title>CABI Digital Library</title></head></html>',
+                                          'text/html; charset=utf-8')
+                self.send_error(404)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                self.body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                for prefix, handler in server.routes:
+                    if url.path.startswith(prefix):
+                        return handler(self, url)
+                if url.path == '/action/downloadCitation':
+                    with server.lock:
+                        server.citation_requests += 1
+                    form = parse_qs(self.body.decode('utf-8'))
+                    body = ''.join(synthetic_ris(doi) for doi in form.get('doi', [])).encode('utf-8')
+                    return self.send_body(body, 'application/x-research-info-systems; charset=utf-8')
+                if url.path == '/v1/chat/completions':
+                    with server.lock:
+                        server.chat_requests += 1
+                        throttled = server.chat_failures > 0
+                        if throttled:
+                            server.chat_failures -= 1
+                    if throttled:
+                        self.send_response(429)
+                        self.send_header('Retry-After', '0')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    body = json.dumps(server.chat_completion(json.loads(self.body))).encode('utf-8')
+                    return self.send_body(body, 'application/json')
+                self.send_error(404)
+
+            def send_body(self, body, content_type, allow_range=False, status=200, etag=None):
+                start = 0
+                range_header = self.headers.get('Range') if allow_range else None
+                if range_header and self.headers.get('If-Range') not in (None, etag):
+                    # If-Range不匹配：文件已变化，忽略Range返回完整内容
+                    range_header = None
+                if range_header and range_header.startswith('bytes='):
+                    start = int(range_header[6:].split('-')[0] or 0)
+                    if start >= len(body):
+                        self.send_response(416)
+                        self.send_header('Content-Range', f"bytes */{len(body)}")
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    status = 206
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body) - start))
+                if allow_range:
+                    self.send_header('Accept-Ranges', 'bytes')
+                if etag:
+                    self.send_header('ETag', etag)
+                if status == 206:
+                    self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='stand-in-cab', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存(MB)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux上单位为KB，macOS上为字节
+    return usage / 1024 / 1024 if sys.platform == 'darwin' else usage / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_crawler(server, backend):
+    """创建指向本地服务、不做限速等待的爬虫"""
+    return CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, download_rate=10000,
+                                    parser_backend=backend)
+
+
+def bench_search(server, backend):
+    """翻页+解析全部搜索结果页，返回 页/秒"""
+    bench_crawler = new_crawler(server, backend)
+    started = time.perf_counter()
+    articles = bench_crawler.get_search_results(server.search_url)
+    elapsed = time.perf_counter() - started
+    pages = bench_crawler.metrics.counters.get('pages', 0)
+    return {'pages': pages, 'articles': len(articles), 'seconds': elapsed, 'pages_per_second': pages / elapsed}, \
+        articles
+
+
+def bench_extract(server, backend, repeat=5):
+    """对第一页重复执行解析+提取，返回每条结果的平均耗时(微秒)"""
+    bench_crawler = new_crawler(server, backend)
+    html = server.search_page(0).decode('utf-8')
+    items = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        items += len(bench_crawler._extract_articles_from_page(bench_crawler._parse_html(html)))
+    elapsed = time.perf_counter() - started
+    return {'items': items, 'us_per_item': elapsed / max(items, 1) * 1e6}
+
+
+def bench_memory(server, backend, pages):
+    """
+    用tracemalloc测量提取后常驻内存的文章列表每条占用的字节数
+
+    另外单独测量记录容器本身（字段字符串在两种表示间共享）的开销，
+    与导出时使用的等价字典对比。
+    """
+    bench_crawler = new_crawler(server, backend)
+    htmls = [server.search_page(page * SEARCH_PAGE_SIZE).decode('utf-8') for page in range(pages)]
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        articles = []
+        for html in htmls:
+            articles.extend(bench_crawler._extract_articles_from_page(bench_crawler._parse_html(html)))
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+
+        def container_bytes(convert):
+            before = tracemalloc.get_traced_memory()[0]
+            copies = [convert(article) for article in articles]
+            size = tracemalloc.get_traced_memory()[0] - before
+            del copies
+            return size
+
+        record_bytes = container_bytes(dataclasses.replace)
+        dict_bytes = container_bytes(crawler.article_dict)
+    finally:
+        tracemalloc.stop()
+    count = max(len(articles), 1)
+    return {'articles': len(articles), 'bytes_per_article': retained / count,
+            'record_bytes': record_bytes / count, 'dict_bytes': dict_bytes / count}
+
+
+def bench_save(server, articles, output_dir):
+    """保存文章信息，返回耗时和写入速度"""
+    bench_crawler = new_crawler(server, 'html.parser')
+    started = time.perf_counter()
+    bench_crawler.save_articles_info(articles, output_dir)
+    elapsed = time.perf_counter() - started
+    size = sum(p.stat().st_size for p in Path(output_dir).glob('articles_info.*'))
+    return {'seconds': elapsed, 'mb_per_second': size / 1024 / 1024 / elapsed}
+
+
+def bench_download(server, articles, output_dir, concurrency):
+    """批量下载PDF，返回 MB/秒"""
+    bench_crawler = new_crawler(server, 'html.parser')
+    started = time.perf_counter()
+    result = bench_crawler.download_all_pdfs(articles, output_dir, max_concurrent=concurrency)
+    elapsed = time.perf_counter() - started
+    size = sum(p.stat().st_size for p in Path(output_dir).glob('*.pdf'))
+    return {'files': result['success'], 'failed': result['failed'], 'seconds': elapsed,
+            'mb_per_second': size / 1024 / 1024 / elapsed}
+
+
+def run_benchmark(args):
+    """执行全部基准，返回结果字典"""
+    backends = [args.backend] if args.backend else list(PARSER_BACKENDS)
+    work_dir = Path(tempfile.mkdtemp(prefix='cab-bench-'))
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'params': {'pages': args.pages, 'pdf_size_kb': args.pdf_size_kb, 'pdf_latency_ms': args.pdf_latency_ms,
+                   'page_latency_ms': args.page_latency_ms, 'concurrency': args.concurrency,
+                   'pages_dir': args.pages_dir},
+        'search': {},
+        'extract': {},
+    }
+    server = StandInCABServer(total_results=args.pages * SEARCH_PAGE_SIZE, pdf_size=args.pdf_size_kb * 1024,
+                              pdf_latency=args.pdf_latency_ms / 1000, page_latency=args.page_latency_ms / 1000,
+                              pages_dir=args.pages_dir)
+    try:
+        with server:
+            articles = []
+            for backend in backends:
+                try:
+                    results['search'][backend], articles = bench_search(server, backend)
+                    results['extract'][backend] = bench_extract(server, backend)
+                except ImportError as e:
+                    logger.warning(f"跳过解析后端 {backend}: {e}")
+            results['memory'] = bench_memory(server, backends[0], args.pages)
+            results['save'] = bench_save(server, articles, work_dir / 'metadata')
+            results['download'] = bench_download(server, articles[:args.pdf_count], work_dir / 'pdfs',
+                                                 args.concurrency)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def load_previous(results_file):
+    """读取结果文件中的最后一条记录"""
+    path = Path(results_file)
+    if not path.exists():
+        return None
+    lines = [line for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def format_report(results, previous=None):
+    """生成报告文本，有上一次结果时附上变化百分比"""
+    def delta(current, old):
+        if not old:
+            return ''
+        return f" ({(current - old) / old * 100:+.1f}%)"
+
+    def prev(*keys):
+        node = previous
+        for key in keys:
+            if not isinstance(node, dict):
+                return None
+            node = node.get(key)
+        return node
+
+    lines = [f"版本 {results['revision'] or '-'}  Python {results['python']}  参数 {results['params']}"]
+    for backend, stats in results['search'].items():
+        extract = results['extract'][backend]
+        lines.append(f"  [{backend}] 翻页 {stats['pages_per_second']:.1f} 页/秒"
+                     f"{delta(stats['pages_per_second'], prev('search', backend, 'pages_per_second'))}，"
+                     f"解析 {extract['us_per_item']:.1f} 微秒/条"
+                     f"{delta(extract['us_per_item'], prev('extract', backend, 'us_per_item'))}")
+    memory = results['memory']
+    lines.append(f"  文章记录 {memory['bytes_per_article']:.0f} 字节/条"
+                 f"{delta(memory['bytes_per_article'], prev('memory', 'bytes_per_article'))}"
+                 f"（记录容器 {memory['record_bytes']:.0f} 字节，等价dict {memory['dict_bytes']:.0f} 字节）")
+    lines.append(f"  保存 {results['save']['mb_per_second']:.1f} MB/秒"
+                 f"{delta(results['save']['mb_per_second'], prev('save', 'mb_per_second'))}")
+    lines.append(f"  下载 {results['download']['mb_per_second']:.1f} MB/秒"
+                 f"{delta(results['download']['mb_per_second'], prev('download', 'mb_per_second'))}"
+                 f"（{results['download']['files']} 个文件）")
+    lines.append(f"  峰值内存 {results['peak_rss_mb']:.1f} MB{delta(results['peak_rss_mb'], prev('peak_rss_mb'))}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='CAB爬虫离线性能基准')
+    parser.add_argument('--pages', type=int, default=20, help='合成搜索结果的页数')
+    parser.add_argument('--pages-dir', help='录制的搜索结果页目录(*.html)，指定时替代合成页面')
+    parser.add_argument('--backend', choices=PARSER_BACKENDS, help='只测试指定的解析后端')
+    parser.add_argument('--pdf-count', type=int, default=50, help='下载的PDF数量')
+    parser.add_argument('--pdf-size-kb', type=int, default=256, help='合成PDF的大小(KB)')
+    parser.add_argument('--pdf-latency-ms', type=float, default=20, help='PDF响应延迟(毫秒)')
+    parser.add_argument('--page-latency-ms', type=float, default=0, help='搜索结果页响应延迟(毫秒)')
+    parser.add_argument('--concurrency', type=int, default=5, help='并发下载数')
+    parser.add_argument('--results-file', default='benchmarks/results.jsonl', help='结果记录文件')
+    parser.add_argument('--no-save', action='store_true', help='不写入结果记录文件')
+    args = parser.parse_args(argv)
+
+    crawler.logger.setLevel(logging.WARNING)
+    results = run_benchmark(args)
+    print(format_report(results, load_previous(args.results_file)))
+
+    if not args.no_save:
+        path = Path(args.results_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(results, ensure_ascii=False) + '\n')
+        print(f"结果已追加到: {path}")
+
+
+if __name__ == '__main__':
+    main()
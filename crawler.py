@@ -3,36 +3,1759 @@ import time
 import json
 import csv
 import random
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 from pathlib import Path
 import re
+import io
+import gzip
+import zlib
+import hashlib
+import importlib.util
+import sqlite3
+import shutil
+import textwrap
+import sys
+import threading
+import math
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+import queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 import requests
-from bs4 import BeautifulSoup
 import logging
 
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 预编译的匹配规则，避免在逐条解析时重复编译
+DATE_PATTERN = re.compile(r'\d{1,2}\s+\w+\s+\d{4}')
+JOURNAL_HREF_PATTERN = re.compile(r'/journal/')
+NEXT_PATTERN = re.compile(r'next', re.I)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+START_PAGE_PATTERN = re.compile(r'startPage=\d+')
+RESULT_COUNT_PATTERN = re.compile(r'(\d[\d,]*)\s+results?\b', re.I)
+RESULT_COUNT_OF_PATTERN = re.compile(r'\bof\s+(\d[\d,]*)', re.I)
+RESULT_NUMBER_PATTERN = re.compile(r'\d[\d,]*')
+RIS_LINE_PATTERN = re.compile(r'^([A-Z][A-Z0-9])  -(?: (.*))?$')
+DOI_PREFIX_PATTERN = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)', re.I)
+
+# 网站根地址
+DEFAULT_BASE_URL = "https://www.cabidigitallibrary.org"
+
+# 每个搜索结果页的文章数（startPage参数按此步长偏移）
+SEARCH_PAGE_SIZE = 20
+
+# 文章信息的字段及导出顺序
+ARTICLE_FIELDS = ('title', 'authors', 'publication_date', 'doi', 'abstract', 'pdf_url', 'article_url',
+                  'journal', 'volume', 'issue', 'pages')
+
+# 搜索结果中发布日期的格式，例如 "12 March 2024"
+PUBLICATION_DATE_FORMATS = ('%d %B %Y', '%d %b %Y')
+
+# 摘要增强（分类和总结）使用的系统提示词，模型需按此格式返回JSON
+ENRICH_PROMPT = (
+    "You classify and summarize agricultural research preprints. The user message is a JSON array of "
+    "objects with a doi and an abstract. For every item return an object with the same doi, a short "
+    "subject category and a one-sentence summary of the abstract. Reply with JSON only, in the form "
+    '{"results": [{"doi": "...", "category": "...", "summary": "..."}]}.'
+)
+
+# 搜索结果页的HTML解析后端：BeautifulSoup内置解析器、BeautifulSoup+lxml、selectolax(lexbor)
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+
+@dataclass(slots=True)
+class Article:
+    """
+    单篇文章的信息
+
+    使用__slots__而不是字典保存，大量文章常驻内存时占用更少；
+    同时提供get/[]/keys等字典式接口，导出时再通过to_dict转换为字典。
+    字段顺序即导出顺序，与ARTICLE_FIELDS一致。
+    """
+    title: str = ''
+    authors: str = ''
+    publication_date: str = ''
+    doi: str = ''
+    abstract: str = ''
+    pdf_url: str = ''
+    article_url: str = ''
+    journal: str = ''
+    volume: str = ''
+    issue: str = ''
+    pages: str = ''
+
+    def __getitem__(self, key):
+        if key not in ARTICLE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in ARTICLE_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in ARTICLE_FIELDS
+
+    def get(self, key, default=None):
+        """与dict.get一致，未知字段返回default"""
+        return getattr(self, key) if key in ARTICLE_FIELDS else default
+
+    @staticmethod
+    def keys():
+        return ARTICLE_FIELDS
+
+    def to_dict(self):
+        """按导出顺序转换为字典"""
+        return {key: getattr(self, key) for key in ARTICLE_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典（如JSON导出的记录）创建，忽略未知字段"""
+        return cls(**{key: data[key] for key in ARTICLE_FIELDS if data.get(key) is not None})
+
+
+def article_dict(article):
+    """导出时把文章记录统一转换为字典"""
+    return article.to_dict() if isinstance(article, Article) else article
+
+
+def parse_publication_date(text):
+    """解析搜索结果中的发布日期，无法解析时返回None"""
+    text = (text or '').strip()
+    for fmt in PUBLICATION_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def build_search_url(series_key=None, query=None, base_url=DEFAULT_BASE_URL, sort_by='EPubDate', **params):
+    """
+    构造搜索结果页URL
+
+    Args:
+        series_key (str): 期刊/预印本系列，如 'agrirxiv'
+        query (str): 全文关键词检索（AllField）
+        base_url (str): 网站根地址
+        sort_by (str): 排序方式，默认按发布时间倒序
+        **params: 其他搜索参数，原样加入查询串
+
+    Returns:
+        str: 第一页的搜索URL
+    """
+    query_params = {}
+    if series_key:
+        query_params['SeriesKey'] = series_key
+    if query:
+        query_params['AllField'] = query
+    query_params.update(params)
+    query_params['startPage'] = 0
+    if sort_by:
+        query_params['sortBy'] = sort_by
+    return f"{base_url}/action/doSearch?{urlencode(query_params)}"
+
+
+DEFAULT_SEARCH_URL = build_search_url(series_key='agrirxiv')
+
+
+def parse_ris(text):
+    """
+    解析RIS格式的引文导出
+
+    Args:
+        text (str): RIS文本，可包含多条记录
+
+    Returns:
+        list: 每条记录为 {标签: [值, ...]}，折行的内容并入上一个标签的值
+    """
+    records, record, last_tag = [], {}, None
+    for line in text.splitlines():
+        match = RIS_LINE_PATTERN.match(line)
+        if match:
+            tag, value = match.group(1), (match.group(2) or '').strip()
+            if tag == 'ER':
+                if record:
+                    records.append(record)
+                record, last_tag = {}, None
+                continue
+            record.setdefault(tag, []).append(value)
+            last_tag = tag
+        elif last_tag and line.strip():
+            record[last_tag][-1] = f"{record[last_tag][-1]} {line.strip()}".strip()
+    if record:
+        records.append(record)
+    return records
+
+
+def ris_record_fields(record):
+    """把一条RIS记录转换为文章信息字段（只包含记录中有值的字段）"""
+    def first(*tags):
+        return next((record[tag][0] for tag in tags if record.get(tag) and record[tag][0]), '')
+
+    # RIS中的作者为"姓, 名"，转换为与搜索结果一致的"名 姓"
+    authors = [' '.join(reversed(name.split(', ', 1))) for name in record.get('AU') or record.get('A1') or []]
+    fields = {
+        'doi': DOI_PREFIX_PATTERN.sub('', first('DO')),
+        'title': first('TI', 'T1'),
+        'authors': ', '.join(authors),
+        'abstract': first('AB', 'N2'),
+        'journal': first('JO', 'JF', 'T2'),
+        'volume': first('VL'),
+        'issue': first('IS'),
+        'pages': '-'.join(page for page in (first('SP'), first('EP')) if page),
+    }
+    return {key: value for key, value in fields.items() if value}
+
+
+def file_sha256(path):
+    """按块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_pdf_text(path):
+    """
+    提取PDF全文和页数（在子进程中执行，需要安装pypdf）
+
+    Args:
+        path (str): PDF文件路径
+
+    Returns:
+        tuple: (全文, 页数, 耗时秒数)
+    """
+    from pypdf import PdfReader
+
+    started = time.perf_counter()
+    reader = PdfReader(path)
+    text = '\n\n'.join(page.extract_text() or '' for page in reader.pages)
+    return text, len(reader.pages), time.perf_counter() - started
+
+
+def parse_retry_after(value):
+    """解析Retry-After响应头（秒数或HTTP日期），返回需要等待的秒数，无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    按主机划分的AIMD自适应限速器（线程安全）
+
+    每个主机维护一个请求间隔：请求成功且延迟正常时按固定步长缩短间隔（加性增速），
+    遇到限流响应或延迟超过目标值时按倍数拉长间隔（乘性减速）。
+    间隔下限由max_rate决定，实际等待时间带有少量随机抖动。
+    """
+
+    def __init__(self, max_rate=1.0, initial_interval=None, max_interval=120.0, additive_step=0.1,
+                 backoff_factor=2.0, latency_target=5.0, jitter=0.2):
+        """
+        Args:
+            max_rate (float): 每个主机每秒允许的最大请求数
+            initial_interval (float): 初始请求间隔（秒），默认为最小间隔
+            max_interval (float): 请求间隔上限（秒）
+            additive_step (float): 每次正常响应后缩短的间隔（秒）
+            backoff_factor (float): 限流或高延迟时间隔放大的倍数
+            latency_target (float): 延迟超过该值（秒）时视为服务器过载
+            jitter (float): 等待时间的随机抖动比例
+        """
+        self.min_interval = 1.0 / max_rate
+        self.initial_interval = initial_interval or self.min_interval
+        self.max_interval = max(max_interval, self.initial_interval)
+        self.additive_step = additive_step
+        self.backoff_factor = backoff_factor
+        self.latency_target = latency_target
+        self.jitter = jitter
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host_state(self, url):
+        host = urlparse(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {'interval': self.initial_interval, 'next_allowed': 0.0}
+        return state
+
+    def acquire(self, url):
+        """按主机预约下一个请求时间并等待，返回等待的秒数"""
+        with self.lock:
+            state = self._host_state(url)
+            now = time.monotonic()
+            start = max(now, state['next_allowed'])
+            interval = state['interval'] * random.uniform(1 - self.jitter, 1 + self.jitter)
+            state['next_allowed'] = start + interval
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self, url, latency):
+        """请求成功：延迟正常时加性增速，延迟过高时乘性减速"""
+        with self.lock:
+            state = self._host_state(url)
+            if latency > self.latency_target:
+                state['interval'] = min(self.max_interval, state['interval'] * self.backoff_factor)
+            else:
+                state['interval'] = max(self.min_interval, state['interval'] - self.additive_step)
+
+    def on_throttle(self, url, retry_after=None):
+        """服务器限流：乘性减速，并在Retry-After指定的时间之前暂停该主机的请求"""
+        with self.lock:
+            state = self._host_state(url)
+            state['interval'] = min(self.max_interval, state['interval'] * self.backoff_factor)
+            if retry_after is not None:
+                state['next_allowed'] = max(state['next_allowed'], time.monotonic() + retry_after)
+
+    def intervals(self):
+        """返回各主机当前的请求间隔"""
+        with self.lock:
+            return {host: state['interval'] for host, state in self.hosts.items()}
+
+
+class RequestScheduler:
+    """
+    爬虫所有HTTP请求的统一调度：按主机自适应限速、失败重试和等待/工作时间统计
+
+    429/503响应遵循Retry-After（没有时使用带随机抖动的指数退避）后重试，
+    连接错误、超时和其他5xx响应按指数退避重试，403视为限流信号但直接返回给调用方处理。
+    PDF下载使用单独的限速器，与搜索页等其他请求各自占用独立的请求预算。
+    """
+
+    RETRY_STATUSES = (429, 503)
+    THROTTLE_STATUSES = (403, 429, 503)
+
+    def __init__(self, max_rate=1.0, max_retries=3, backoff_base=2.0, backoff_max=120.0, observer=None,
+                 download_rate=None, **limiter_options):
+        """
+        Args:
+            max_rate (float): 每个主机每秒允许的最大请求数
+            max_retries (int): 单个请求的最大重试次数
+            backoff_base (float): 指数退避的基数（秒）
+            backoff_max (float): 单次退避的上限（秒）
+            observer (CrawlMetrics): 记录每次请求耗时(fetch)和等待时间(wait)的指标对象
+            download_rate (float): 每个主机每秒允许的PDF下载请求数，None时与其他请求共用max_rate的预算
+            **limiter_options: 传给AdaptiveRateLimiter的其他参数
+        """
+        self.limiter = AdaptiveRateLimiter(max_rate, **limiter_options)
+        self.download_limiter = (AdaptiveRateLimiter(download_rate, **limiter_options) if download_rate
+                                 else self.limiter)
+        self.observer = observer
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'errors': 0,
+                      'wait_seconds': 0.0, 'work_seconds': 0.0}
+
+    def _record(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+        if self.observer is not None:
+            if deltas.get('wait_seconds'):
+                self.observer.observe('wait', deltas['wait_seconds'])
+            if 'work_seconds' in deltas:
+                self.observer.observe('fetch', deltas['work_seconds'])
+
+    def backoff_delay(self, attempt):
+        """第attempt次重试的退避时间（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def sleep_backoff(self, attempt):
+        """按指数退避等待，并计入等待时间"""
+        delay = self.backoff_delay(attempt)
+        time.sleep(delay)
+        self._record(wait_seconds=delay)
+        return delay
+
+    def request(self, session, method, url, throttle=True, download=False, **kwargs):
+        """
+        通过限速和重试策略发送请求
+
+        Args:
+            session (requests.Session): 使用的会话
+            method (str): HTTP方法
+            url (str): 请求URL
+            throttle (bool): 是否参与限速（例如可由本地缓存直接提供的请求不需要）
+            download (bool): 是否为PDF下载，使用下载的限速预算
+            **kwargs: 传给session.request的参数
+
+        Returns:
+            requests.Response: 最后一次请求的响应
+        """
+        limiter = self.download_limiter if download else self.limiter
+        for attempt in range(self.max_retries + 1):
+            if throttle:
+                self._record(wait_seconds=limiter.acquire(url))
+
+            started = time.monotonic()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record(requests=1, errors=1, work_seconds=time.monotonic() - started)
+                if isinstance(e, CacheMissError) or attempt == self.max_retries:
+                    raise
+                logger.warning(f"请求失败，准备重试({attempt + 1}/{self.max_retries}): {url}: {e}")
+                self._record(retries=1)
+                self.sleep_backoff(attempt)
+                continue
+
+            latency = time.monotonic() - started
+            self._record(requests=1, work_seconds=latency)
+            status = response.status_code
+
+            if status in self.THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                limiter.on_throttle(url, retry_after)
+                self._record(throttled=1)
+                if status not in self.RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                logger.warning(f"服务器限流({status})，{delay:.1f} 秒后重试: {url}")
+            elif status >= 500 and attempt < self.max_retries:
+                delay = self.backoff_delay(attempt)
+                logger.warning(f"服务器错误({status})，{delay:.1f} 秒后重试: {url}")
+            else:
+                if throttle:
+                    limiter.on_success(url, latency)
+                return response
+
+            response.close()
+            self._record(retries=1, wait_seconds=delay)
+            time.sleep(delay)
+
+        return response
+
+    def metrics(self):
+        """返回请求统计和各主机当前的请求间隔"""
+        with self.lock:
+            metrics = dict(self.stats)
+        metrics['intervals'] = self.limiter.intervals()
+        if self.download_limiter is not self.limiter:
+            metrics['download_intervals'] = self.download_limiter.intervals()
+        return metrics
+
+
+class CrawlMetrics:
+    """
+    爬虫运行指标（线程安全）
+
+    记录各阶段(fetch/wait/parse/extract/write/download)耗时的直方图、计数器
+    （字节数、页数、文章数、重试、403等）和队列深度，可导出为Prometheus文本格式或JSON，
+    并生成运行结束时的汇总报告。
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float('inf'))
+    PREFIX = 'cab_crawler'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.histograms = {}
+        self.counters = {}
+        self.queue_depths = {}
+        self.queue_max_depths = {}
+
+    @contextmanager
+    def timer(self, stage):
+        """统计代码块耗时并计入对应阶段的直方图"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage, seconds):
+        """记录一次阶段耗时（秒）"""
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = {'buckets': [0] * len(self.BUCKETS), 'count': 0, 'sum': 0.0}
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+                    break
+            histogram['count'] += 1
+            histogram['sum'] += seconds
+
+    def inc(self, name, value=1):
+        """累加计数器"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_queue_depth(self, queue_name, depth):
+        """记录队列当前深度及历史最大深度"""
+        with self.lock:
+            self.queue_depths[queue_name] = depth
+            self.queue_max_depths[queue_name] = max(depth, self.queue_max_depths.get(queue_name, 0))
+
+    def _quantile(self, histogram, q):
+        """根据直方图桶估算分位数（返回所在桶的上界）"""
+        target = histogram['count'] * q
+        cumulative = 0
+        for bound, count in zip(self.BUCKETS, histogram['buckets']):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float('inf')
+
+    def snapshot(self, extra_counters=None):
+        """返回所有指标的字典形式"""
+        with self.lock:
+            elapsed = time.monotonic() - self._started
+            counters = dict(self.counters)
+            counters.update(extra_counters or {})
+            stages = {}
+            for stage, histogram in self.histograms.items():
+                stages[stage] = {
+                    'count': histogram['count'],
+                    'sum_seconds': histogram['sum'],
+                    'avg_seconds': histogram['sum'] / histogram['count'] if histogram['count'] else 0.0,
+                    'p50_seconds': self._quantile(histogram, 0.5),
+                    'p95_seconds': self._quantile(histogram, 0.95),
+                    'buckets': {str(bound): count for bound, count in zip(self.BUCKETS, histogram['buckets'])},
+                }
+            return {
+                'started_at': self.started_at,
+                'elapsed_seconds': elapsed,
+                'stages': stages,
+                'counters': counters,
+                'queue_depths': dict(self.queue_depths),
+                'queue_max_depths': dict(self.queue_max_depths),
+            }
+
+    def to_prometheus(self, extra_counters=None):
+        """导出Prometheus文本格式"""
+        snapshot = self.snapshot(extra_counters)
+        prefix = self.PREFIX
+        lines = [f"# HELP {prefix}_stage_seconds Time spent per crawl stage",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        with self.lock:
+            histograms = {stage: dict(h, buckets=list(h['buckets'])) for stage, h in self.histograms.items()}
+        for stage, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS, histogram['buckets']):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        lines.append(f"# TYPE {prefix}_queue_depth gauge")
+        for queue_name, depth in sorted(snapshot['queue_depths'].items()):
+            lines.append(f'{prefix}_queue_depth{{queue="{queue_name}"}} {depth}')
+        lines.append(f"# TYPE {prefix}_queue_max_depth gauge")
+        for queue_name, depth in sorted(snapshot['queue_max_depths'].items()):
+            lines.append(f'{prefix}_queue_max_depth{{queue="{queue_name}"}} {depth}')
+        lines.append(f"# TYPE {prefix}_elapsed_seconds gauge")
+        lines.append(f"{prefix}_elapsed_seconds {snapshot['elapsed_seconds']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, extra_counters=None):
+        """写入指标文件：.json后缀为JSON，其他为Prometheus文本格式"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == '.json':
+            content = json.dumps(self.snapshot(extra_counters), indent=2, ensure_ascii=False)
+        else:
+            content = self.to_prometheus(extra_counters)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        tmp_path.write_text(content, encoding='utf-8')
+        os.replace(tmp_path, path)
+
+    def summary(self, extra_counters=None):
+        """生成运行汇总报告文本"""
+        snapshot = self.snapshot(extra_counters)
+        elapsed = snapshot['elapsed_seconds'] or 1e-9
+        counters = snapshot['counters']
+        lines = [f"运行时间: {elapsed:.1f} 秒"]
+        for stage, stats in sorted(snapshot['stages'].items()):
+            lines.append(f"  {stage:<9} 次数 {stats['count']:>7}  总计 {stats['sum_seconds']:>9.2f} 秒  "
+                         f"平均 {stats['avg_seconds'] * 1000:>9.1f} 毫秒  p95 <= {stats['p95_seconds']} 秒")
+        lines.append(f"  页面 {counters.get('pages', 0)} ({counters.get('pages', 0) / elapsed:.2f} 页/秒)，"
+                     f"文章 {counters.get('articles', 0)} ({counters.get('articles', 0) / elapsed:.2f} 篇/秒)，"
+                     f"下载 {counters.get('bytes_downloaded', 0) / 1024 / 1024:.2f} MB "
+                     f"({counters.get('bytes_downloaded', 0) / 1024 / 1024 / elapsed:.2f} MB/秒)")
+        others = {k: v for k, v in counters.items() if k not in ('pages', 'articles', 'bytes_downloaded')}
+        if others:
+            lines.append("  " + "，".join(f"{k} {v:.1f}" if isinstance(v, float) else f"{k} {v}"
+                                         for k, v in sorted(others.items())))
+        if snapshot['queue_max_depths']:
+            lines.append("  队列最大深度: " + "，".join(f"{k} {v}" for k, v in sorted(snapshot['queue_max_depths'].items())))
+        return '\n'.join(lines)
+
+
+class CrawlStateStore:
+    """
+    基于SQLite的爬取状态存储
+
+    按DOI记录文章元数据和PDF下载状态，并按搜索URL记录翻页进度，
+    用于增量爬取和崩溃后的断点续爬。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS crawl_cursor (
+                search_url TEXT PRIMARY KEY,
+                next_page INTEGER NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                run_started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                doi TEXT PRIMARY KEY,
+                search_url TEXT,
+                metadata TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                download_status TEXT NOT NULL DEFAULT 'pending',
+                file_path TEXT,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def get_cursor(self, search_url):
+        """返回搜索URL的翻页进度字典，不存在时返回None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT next_page, completed, run_started_at FROM crawl_cursor WHERE search_url = ?",
+                (search_url,)).fetchone()
+        if row is None:
+            return None
+        return {'next_page': row[0], 'completed': bool(row[1]), 'run_started_at': row[2]}
+
+    def start_run(self, search_url, start_page=0, run_started_at=None):
+        """开始（或恢复）一次爬取，返回本次爬取的开始时间"""
+        now = time.time()
+        run_started_at = run_started_at or now
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO crawl_cursor (search_url, next_page, completed, run_started_at, updated_at) "
+                "VALUES (?, ?, 0, ?, ?) ON CONFLICT(search_url) DO UPDATE SET "
+                "next_page = excluded.next_page, completed = 0, "
+                "run_started_at = excluded.run_started_at, updated_at = excluded.updated_at",
+                (search_url, start_page, run_started_at, now))
+        return run_started_at
+
+    def commit_page(self, search_url, page, articles):
+        """在同一事务中保存一页文章并推进翻页进度"""
+        now = time.time()
+        with self.lock, self.conn:
+            for article in articles:
+                if not article.get('doi'):
+                    continue
+                self.conn.execute(
+                    "INSERT INTO articles (doi, search_url, metadata, first_seen, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(doi) DO UPDATE SET "
+                    "metadata = excluded.metadata, updated_at = excluded.updated_at",
+                    (article['doi'], search_url, json.dumps(article_dict(article), ensure_ascii=False), now, now))
+            self.conn.execute(
+                "UPDATE crawl_cursor SET next_page = ?, updated_at = ? WHERE search_url = ?",
+                (page + 1, now, search_url))
+
+    def update_metadata(self, articles):
+        """按DOI更新已记录文章的元数据（例如补全引文信息后）"""
+        now = time.time()
+        with self.lock, self.conn:
+            for article in articles:
+                if article.get('doi'):
+                    self.conn.execute(
+                        "UPDATE articles SET metadata = ?, updated_at = ? WHERE doi = ?",
+                        (json.dumps(article_dict(article), ensure_ascii=False), now, article['doi']))
+
+    def mark_completed(self, search_url):
+        """标记搜索URL已爬取完成"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE crawl_cursor SET completed = 1, updated_at = ? WHERE search_url = ?",
+                (time.time(), search_url))
+
+    def seen_dois(self, dois, before=None):
+        """返回已记录的DOI集合，before不为空时只返回在该时间之前首次出现的DOI"""
+        dois = [doi for doi in dois if doi]
+        if not dois:
+            return set()
+        sql = f"SELECT doi FROM articles WHERE doi IN ({','.join('?' * len(dois))})"
+        params = list(dois)
+        if before is not None:
+            sql += " AND first_seen < ?"
+            params.append(before)
+        with self.lock:
+            return {row[0] for row in self.conn.execute(sql, params)}
+
+    def get_download(self, doi):
+        """返回(下载状态, 文件路径)，未记录时返回None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT download_status, file_path FROM articles WHERE doi = ?", (doi,)).fetchone()
+        return tuple(row) if row else None
+
+    def set_download(self, doi, status, file_path=None):
+        """记录文章的下载状态"""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE articles SET download_status = ?, file_path = ?, updated_at = ? WHERE doi = ?",
+                (status, str(file_path) if file_path else None, time.time(), doi))
+
+    def articles(self, search_url=None, pending_only=False):
+        """按首次出现顺序返回已记录的文章信息列表，search_url可以是单个URL或URL列表"""
+        sql = "SELECT metadata FROM articles"
+        conditions, params = [], []
+        if search_url is not None:
+            urls = [search_url] if isinstance(search_url, str) else list(search_url)
+            conditions.append(f"search_url IN ({','.join('?' * len(urls))})")
+            params.extend(urls)
+        if pending_only:
+            conditions.append("download_status != 'downloaded'")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY rowid"
+        with self.lock:
+            return [Article.from_dict(json.loads(row[0])) for row in self.conn.execute(sql, params)]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class WorkQueue:
+    """
+    基于SQLite的租约式工作队列，供多个节点分担同一次爬取
+
+    任务分为搜索结果页(page)和PDF下载(download)两类，页面任务优先领取。
+    领取任务时获得有限期的租约，完成后标记为done；租约过期仍未完成的任务
+    （例如所在节点已崩溃）会被其他节点重新领取。各节点解析出的文章按DOI
+    合并到同一个articles表中，最后统一导出。数据库可以放在共享文件系统上。
+    """
+
+    KINDS = ('page', 'download')
+
+    def __init__(self, db_path, lease_seconds=600, max_attempts=3):
+        """
+        Args:
+            db_path (str): 队列数据库路径
+            lease_seconds (float): 租约时长（秒），超过后任务可被重新领取
+            max_attempts (int): 单个任务的最多尝试次数，超过后标记为failed
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        # 多个进程同时写入时等待锁释放，而不是立即报错
+        self.conn = sqlite3.connect(str(self.db_path), timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                updated_at REAL NOT NULL,
+                UNIQUE (kind, key)
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, kind);
+            CREATE TABLE IF NOT EXISTS articles (
+                doi TEXT PRIMARY KEY,
+                search_url TEXT,
+                metadata TEXT NOT NULL,
+                first_seen REAL NOT NULL
+            );
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        """写事务：BEGIN IMMEDIATE在开始时即取得写锁，避免多个节点领取到同一任务"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enqueue(self, kind, key, payload):
+        """加入任务，相同(kind, key)的任务已存在时忽略，返回是否新加入"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO tasks (kind, key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                (kind, key, json.dumps(payload, ensure_ascii=False), time.time()))
+        return cursor.rowcount > 0
+
+    def claim(self, owner):
+        """
+        领取一个任务：未领取的任务或租约已过期的任务，页面任务优先
+
+        Args:
+            owner (str): 领取者标识
+
+        Returns:
+            dict: {'id', 'kind', 'key', 'payload', 'attempts'}，没有可领取的任务时返回None
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # 多次领取后仍未完成的过期任务不再重试
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts))
+            row = conn.execute(
+                "SELECT id, kind, key, payload, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY kind = 'page' DESC, id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (owner, now + self.lease_seconds, now, row[0]))
+        return {'id': row[0], 'kind': row[1], 'key': row[2], 'payload': json.loads(row[3]), 'attempts': row[4] + 1}
+
+    def complete(self, task, owner):
+        """标记任务完成；租约已被其他节点接手时返回False"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time(), task['id'], owner))
+        return cursor.rowcount > 0
+
+    def release(self, task, owner):
+        """任务失败时放回队列，超过最多尝试次数时标记为failed"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (self.max_attempts, time.time(), task['id'], owner))
+
+    def add_articles(self, articles, search_url=None):
+        """按DOI合并一页文章，返回首次出现的文章"""
+        now = time.time()
+        new_articles = []
+        with self._transaction() as conn:
+            for article in articles:
+                if not article.get('doi'):
+                    continue
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO articles (doi, search_url, metadata, first_seen) VALUES (?, ?, ?, ?)",
+                    (article['doi'], search_url, json.dumps(article_dict(article), ensure_ascii=False), now))
+                if cursor.rowcount:
+                    new_articles.append(article)
+        return new_articles
+
+    def articles(self):
+        """按首次出现顺序返回所有节点合并后的文章"""
+        with self.lock:
+            rows = self.conn.execute("SELECT metadata FROM articles ORDER BY first_seen, rowid").fetchall()
+        return [Article.from_dict(json.loads(row[0])) for row in rows]
+
+    def counts(self):
+        """返回 {kind: {status: 数量}}"""
+        counts = {kind: {} for kind in self.KINDS}
+        with self.lock:
+            for kind, status, count in self.conn.execute(
+                    "SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status"):
+                counts.setdefault(kind, {})[status] = count
+        return counts
+
+    def is_drained(self):
+        """是否已没有待处理或处理中的任务（failed任务不会再被领取，也视为已处理完，需另行检查counts）"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status IN ('pending', 'leased')").fetchone()
+        return row[0] == 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CacheMissError(requests.exceptions.ConnectionError):
+    """离线回放模式下缓存未命中"""
+
+
+class HTTPCache:
+    """
+    磁盘HTTP响应缓存
+
+    按URL存储响应（元数据和响应体分别保存为<key>.json和<key>.body），
+    超过TTL的条目在有ETag/Last-Modified时通过条件请求重新验证，
+    缓存总大小超过上限时按最近访问时间淘汰（LRU）。
+    离线模式下只从缓存回放，不访问网络。
+    """
+
+    # 响应体已由requests解码，这些头部不再适用于缓存中的内容
+    DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie')
+
+    def __init__(self, cache_dir, ttl=24 * 3600, max_bytes=512 * 1024 * 1024, offline=False,
+                 url_pattern=r'/action/doSearch'):
+        """
+        Args:
+            cache_dir (str): 缓存目录
+            ttl (float): 缓存条目的有效期（秒），None表示永不过期
+            max_bytes (int): 缓存总大小上限（字节）
+            offline (bool): 离线回放模式
+            url_pattern (str): 需要缓存的URL正则，默认只缓存搜索结果页
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.url_pattern = re.compile(url_pattern)
+        self.lock = threading.Lock()
+        self.total_bytes = sum(path.stat().st_size for path in self.cache_dir.glob('*.body'))
+
+    def matches(self, url):
+        """URL是否属于缓存范围"""
+        return bool(self.url_pattern.search(url))
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def get(self, url):
+        """读取缓存条目，返回(元数据, 响应体)，不存在时返回None"""
+        meta_path, body_path = self._paths(url)
+        with self.lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+                body = body_path.read_bytes()
+            except (OSError, ValueError):
+                return None
+            # 更新访问时间，供LRU淘汰使用
+            os.utime(meta_path)
+        return meta, body
+
+    def is_fresh(self, meta):
+        """缓存条目是否仍在有效期内"""
+        return self.ttl is None or time.time() - meta['stored_at'] < self.ttl
+
+    def can_serve(self, url):
+        """URL是否可以直接由缓存提供而无需访问网络"""
+        if not self.matches(url):
+            return False
+        meta_path, _ = self._paths(url)
+        if self.offline:
+            return meta_path.exists()
+        try:
+            return self.is_fresh(json.loads(meta_path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            return False
+
+    def put(self, url, response):
+        """写入缓存条目并在超出容量时淘汰最久未访问的条目"""
+        meta_path, body_path = self._paths(url)
+        body = response.content
+        meta = {
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in self.DROPPED_HEADERS},
+            'stored_at': time.time(),
+        }
+        with self.lock:
+            old_size = body_path.stat().st_size if body_path.exists() else 0
+            # 先写临时文件再替换，避免中断时留下不完整的条目
+            tmp_body = body_path.with_suffix('.body.tmp')
+            tmp_body.write_bytes(body)
+            os.replace(tmp_body, body_path)
+            tmp_meta = meta_path.with_suffix('.json.tmp')
+            tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_meta, meta_path)
+            self.total_bytes += len(body) - old_size
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def refresh(self, url):
+        """重新验证成功(304)后刷新条目的存储时间"""
+        meta_path, _ = self._paths(url)
+        with self.lock:
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                return
+            meta['stored_at'] = time.time()
+            meta_path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+
+    def _evict(self):
+        """按最近访问时间淘汰条目，直到总大小不超过上限（调用方需持有锁）"""
+        entries = sorted(self.cache_dir.glob('*.json'), key=lambda path: path.stat().st_mtime)
+        for meta_path in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            body_path = meta_path.with_suffix('.body')
+            try:
+                size = body_path.stat().st_size
+                body_path.unlink()
+                meta_path.unlink()
+            except OSError:
+                continue
+            self.total_bytes -= size
+            logger.debug(f"缓存已淘汰: {meta_path.stem}")
+
+
+class CachingHTTPAdapter(requests.adapters.HTTPAdapter):
+    """在会话传输层接入HTTPCache的适配器，只缓存非流式的GET请求"""
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, **kwargs):
+        url = request.url
+        if request.method != 'GET' or stream or not self.cache.matches(url):
+            return super().send(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(url)
+        if entry and (self.cache.offline or self.cache.is_fresh(entry[0])):
+            return self._cached_response(request, entry)
+        if self.cache.offline:
+            raise CacheMissError(f"离线模式下缓存未命中: {url}", request=request)
+
+        if entry:
+            # 条件请求重新验证过期条目
+            headers = entry[0]['headers']
+            lowered = {k.lower(): v for k, v in headers.items()}
+            if 'etag' in lowered:
+                request.headers['If-None-Match'] = lowered['etag']
+            if 'last-modified' in lowered:
+                request.headers['If-Modified-Since'] = lowered['last-modified']
+
+        response = super().send(request, stream=stream, **kwargs)
+        if response.status_code == 304 and entry:
+            self.cache.refresh(url)
+            return self._cached_response(request, entry)
+        if response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def _cached_response(self, request, entry):
+        """由缓存条目构造响应对象"""
+        meta, body = entry
+        response = requests.Response()
+        response.status_code = meta['status']
+        response.reason = meta.get('reason')
+        response.headers = requests.structures.CaseInsensitiveDict(meta['headers'])
+        response._content = body
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.connection = self
+        response.from_cache = True
+        return response
+
+
+class PDFStore:
+    """
+    按内容寻址的PDF存储
+
+    每个PDF按SHA-256只保存一份（objects/<前两位>/<哈希>.pdf），
+    SQLite索引记录DOI/URL → 哈希 → 对象路径的映射，
+    下载目录中的可读文件名只是指向对象的硬链接（不支持时退回符号链接或复制）。
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): 存储根目录，可以放在多次爬取共享的归档卷上
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS objects (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                doi TEXT,
+                sha256 TEXT NOT NULL REFERENCES objects(sha256),
+                view_path TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_doi ON documents(doi);
+        """)
+        self.conn.commit()
+
+    def object_path(self, sha256):
+        """内容哈希对应的对象路径"""
+        return self.objects_dir / sha256[:2] / f"{sha256}.pdf"
+
+    def lookup(self, doi=None, url=None):
+        """按DOI或PDF链接查找已存储的内容哈希，对象文件缺失时返回None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM documents WHERE (doi = ? AND doi != '') OR url = ? "
+                "ORDER BY updated_at DESC LIMIT 1", (doi or '', url or '')).fetchone()
+        if row is None or not self.object_path(row[0]).exists():
+            return None
+        return row[0]
+
+    def add(self, src_path, view_path=None, doi=None, url=None):
+        """
+        把已下载的文件放入存储并建立可读视图
+
+        内容已存在时删除源文件，只登记DOI/URL并建立视图。
+
+        Args:
+            src_path (str): 已校验的下载文件，调用后被移入存储或删除
+            view_path (str): 可读文件名的链接路径，None时不建立视图
+            doi (str): 文章DOI
+            url (str): PDF链接
+
+        Returns:
+            tuple: (内容哈希, 是否为重复内容)
+        """
+        src_path = Path(src_path)
+        sha256 = file_sha256(src_path)
+        size = src_path.stat().st_size
+        obj_path = self.object_path(sha256)
+
+        now = time.time()
+        with self.lock:
+            duplicate = obj_path.exists()
+            if duplicate:
+                src_path.unlink()
+            else:
+                obj_path.parent.mkdir(parents=True, exist_ok=True)
+                # 存储可能在另一个文件系统上，先移动到临时名再原子替换
+                tmp_path = obj_path.with_suffix('.pdf.tmp')
+                shutil.move(str(src_path), str(tmp_path))
+                os.replace(tmp_path, obj_path)
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO objects (sha256, size, stored_at) VALUES (?, ?, ?)",
+                    (sha256, size, now))
+                self.conn.execute(
+                    "INSERT INTO documents (url, doi, sha256, view_path, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET doi = excluded.doi, sha256 = excluded.sha256, "
+                    "view_path = COALESCE(excluded.view_path, documents.view_path), updated_at = excluded.updated_at",
+                    (url or f"sha256:{sha256}", doi, sha256, str(view_path) if view_path else None, now))
+        if view_path is not None:
+            self.link(sha256, view_path)
+        return sha256, duplicate
+
+    def link(self, sha256, view_path):
+        """在view_path建立指向对象的硬链接，不支持时依次退回符号链接和复制"""
+        obj_path = self.object_path(sha256)
+        view_path = Path(view_path)
+        view_path.parent.mkdir(parents=True, exist_ok=True)
+        if view_path.exists() and os.path.samefile(view_path, obj_path):
+            return
+        tmp_path = view_path.with_name(view_path.name + '.link')
+        if os.path.lexists(tmp_path):
+            tmp_path.unlink()
+        try:
+            os.link(obj_path, tmp_path)
+        except OSError:
+            try:
+                os.symlink(obj_path.resolve(), tmp_path)
+            except OSError:
+                shutil.copy2(obj_path, tmp_path)
+        os.replace(tmp_path, view_path)
+
+    def stats(self):
+        """返回(文档数, 对象数, 对象总字节数)"""
+        with self.lock:
+            documents = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            objects, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return documents, objects, size
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SearchIndex:
+    """
+    基于SQLite FTS5的文章全文检索索引
+
+    覆盖标题、作者、摘要和期刊字段，以DOI为键增量更新：
+    同一DOI再次写入时更新原有记录，不会产生重复结果。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # 外部内容表：FTS只保存倒排索引，原文在documents中，由触发器保持同步
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                doi TEXT UNIQUE NOT NULL,
+                title TEXT,
+                authors TEXT,
+                abstract TEXT,
+                journal TEXT,
+                metadata TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, authors, abstract, journal, content='documents', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+                INSERT INTO documents_fts (rowid, title, authors, abstract, journal)
+                VALUES (new.id, new.title, new.authors, new.abstract, new.journal);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, authors, abstract, journal)
+                VALUES ('delete', old.id, old.title, old.authors, old.abstract, old.journal);
+            END;
+            CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+                INSERT INTO documents_fts (documents_fts, rowid, title, authors, abstract, journal)
+                VALUES ('delete', old.id, old.title, old.authors, old.abstract, old.journal);
+                INSERT INTO documents_fts (rowid, title, authors, abstract, journal)
+                VALUES (new.id, new.title, new.authors, new.abstract, new.journal);
+            END;
+        """)
+        self.conn.commit()
+
+    def add(self, articles):
+        """按DOI写入或更新一批文章，返回写入的条数（没有DOI的文章跳过）"""
+        now = time.time()
+        count = 0
+        with self.lock, self.conn:
+            for article in articles:
+                if not article.get('doi'):
+                    continue
+                self.conn.execute(
+                    "INSERT INTO documents (doi, title, authors, abstract, journal, metadata, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(doi) DO UPDATE SET "
+                    "title = excluded.title, authors = excluded.authors, abstract = excluded.abstract, "
+                    "journal = excluded.journal, metadata = excluded.metadata, updated_at = excluded.updated_at",
+                    (article['doi'], article.get('title'), article.get('authors'), article.get('abstract'),
+                     article.get('journal'), json.dumps(article_dict(article), ensure_ascii=False), now))
+                count += 1
+        return count
+
+    def index_pages(self, pages):
+        """包装逐页产出的生成器，每页在向下游传递前先写入索引"""
+        for articles in pages:
+            self.add(articles)
+            yield articles
+
+    def search(self, query, limit=20):
+        """
+        检索文章，按BM25相关度排序
+
+        Args:
+            query (str): FTS5查询语句，如 "soil AND title:health"；语法无效时按普通关键词检索
+            limit (int): 最多返回的条数
+
+        Returns:
+            list: [(文章信息, 相关度得分)]，得分越小越相关
+        """
+        sql = ("SELECT d.metadata, bm25(documents_fts) AS score FROM documents_fts "
+               "JOIN documents d ON d.id = documents_fts.rowid "
+               "WHERE documents_fts MATCH ? ORDER BY score LIMIT ?")
+        with self.lock:
+            try:
+                rows = self.conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # 把每个词作为短语引用，避免标点等被当作FTS5语法
+                quoted = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+                rows = self.conn.execute(sql, (quoted, limit)).fetchall() if quoted else []
+        return [(Article.from_dict(json.loads(metadata)), score) for metadata, score in rows]
+
+    def count(self):
+        """索引中的文章数"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class AbstractEnricher:
+    """
+    通过OpenAI兼容接口对文章摘要做分类和一句话总结（需要安装openai）
+
+    多篇摘要合并为一个请求，请求以有限并发发送，限流或服务端错误时按指数退避重试；
+    结果按 DOI + 提示词哈希 持久缓存在SQLite中，摘要未变化的文章再次运行时不会重复计费。
+    """
+
+    # 可重试的HTTP状态码（连接错误和超时也会重试）
+    RETRY_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+    def __init__(self, cache_path, model='gpt-4o-mini', base_url=None, api_key=None, prompt=ENRICH_PROMPT,
+                 batch_size=10, max_concurrent=4, max_retries=3, backoff_base=2, backoff_max=60, metrics=None):
+        """
+        Args:
+            cache_path (str): 结果缓存数据库路径
+            model (str): 模型名称
+            base_url (str): 接口地址，None时使用openai的默认值（可由OPENAI_BASE_URL环境变量指定）
+            api_key (str): API密钥，None时读取OPENAI_API_KEY环境变量
+            prompt (str): 系统提示词，修改后缓存自动失效
+            batch_size (int): 每个请求包含的摘要数
+            max_concurrent (int): 最大并发请求数
+            max_retries (int): 单个请求的最大重试次数
+            backoff_base (float): 退避时间基数（秒）
+            backoff_max (float): 单次退避的最长时间（秒）
+            metrics (CrawlMetrics): 记录请求耗时和计数，None时不记录
+        """
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.prompt = prompt
+        self.batch_size = max(1, batch_size)
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        self.prompt_hash = hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()[:16]
+        self._client = None
+        self.lock = threading.Lock()
+
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS enrichments (
+                doi TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                abstract_hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (doi, prompt_hash)
+            );
+        """)
+        self.conn.commit()
+
+    @property
+    def client(self):
+        """延迟创建的openai客户端，重试由本类控制"""
+        with self.lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                api_key = self.api_key or os.environ.get('OPENAI_API_KEY')
+                # 本地兼容接口通常不校验密钥，但客户端要求必须提供
+                self._client = OpenAI(base_url=self.base_url, api_key=api_key or 'EMPTY', max_retries=0)
+            return self._client
+
+    def _inc(self, name, value=1):
+        if self.metrics is not None:
+            self.metrics.inc(name, value)
+
+    def enrich(self, articles):
+        """
+        对文章摘要做分类和总结
+
+        Args:
+            articles (iterable): 文章信息，没有DOI或摘要的文章跳过
+
+        Returns:
+            dict: {DOI: {'category': 分类, 'summary': 总结}}，请求失败的文章不在其中
+        """
+        results = {}
+        pending = []
+        for article in articles:
+            doi, abstract = article.get('doi'), article.get('abstract')
+            if not doi or not abstract:
+                continue
+            abstract_hash = hashlib.sha256(abstract.encode('utf-8')).hexdigest()[:16]
+            with self.lock:
+                row = self.conn.execute(
+                    "SELECT result FROM enrichments WHERE doi = ? AND prompt_hash = ? AND abstract_hash = ?",
+                    (doi, self.prompt_hash, abstract_hash)).fetchone()
+            if row is not None:
+                results[doi] = json.loads(row[0])
+            else:
+                pending.append((doi, abstract, abstract_hash))
+
+        cached = len(results)
+        self._inc('enrich_cache_hits', cached)
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        if batches:
+            logger.info(f"摘要增强: {len(pending)} 篇待请求（{len(batches)} 个请求），{cached} 篇命中缓存")
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix='enrich') as executor:
+            futures = [executor.submit(self._enrich_batch, batch) for batch in batches]
+            for batch, future in zip(batches, futures):
+                try:
+                    batch_results = future.result()
+                except Exception as e:
+                    logger.warning(f"摘要增强请求失败（{len(batch)} 篇）: {e}")
+                    batch_results = {}
+                failed += len(batch) - len(batch_results)
+                results.update(batch_results)
+
+        self._inc('enrich_failed', failed)
+        logger.info(f"摘要增强完成: 新增 {len(results) - cached}，缓存 {cached}，失败 {failed}")
+        return results
+
+    def _enrich_batch(self, batch):
+        """发送一个批量请求，返回 {DOI: 结果} 并写入缓存"""
+        payload = json.dumps([{'doi': doi, 'abstract': abstract} for doi, abstract, _ in batch], ensure_ascii=False)
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    temperature=0,
+                    messages=[{'role': 'system', 'content': self.prompt}, {'role': 'user', 'content': payload}])
+                parsed = self._parse_results(response.choices[0].message.content)
+            except Exception as e:
+                status = getattr(e, 'status_code', None)
+                # 连接错误、超时、可重试状态码以及无法解析的回复都重试
+                retryable = status in self.RETRY_STATUSES or isinstance(e, ValueError) or (
+                    status is None and type(e).__name__ in ('APIConnectionError', 'APITimeoutError'))
+                if not retryable or attempt == self.max_retries:
+                    raise
+                response_headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                delay = parse_retry_after(response_headers.get('retry-after'))
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+                logger.warning(f"摘要增强请求失败，{delay:.1f} 秒后重试 ({attempt + 1}/{self.max_retries}): {e}")
+                self._inc('enrich_retries')
+                time.sleep(delay)
+                continue
+            finally:
+                if self.metrics is not None:
+                    self.metrics.observe('enrich', time.perf_counter() - started)
+            break
+
+        self._inc('enrich_requests')
+        usage = getattr(response, 'usage', None)
+        if usage is not None and getattr(usage, 'total_tokens', None):
+            self._inc('enrich_tokens', usage.total_tokens)
+
+        results = {}
+        now = time.time()
+        with self.lock, self.conn:
+            for doi, _, abstract_hash in batch:
+                result = parsed.get(doi)
+                if result is None:
+                    continue
+                results[doi] = result
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO enrichments (doi, prompt_hash, abstract_hash, result, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (doi, self.prompt_hash, abstract_hash, json.dumps(result, ensure_ascii=False), now))
+        self._inc('enriched', len(results))
+        return results
+
+    @staticmethod
+    def _parse_results(content):
+        """解析模型回复中的JSON，返回 {DOI: 结果}，格式不符时抛出ValueError"""
+        content = (content or '').strip()
+        # 兼容包在```json代码块中的回复
+        if content.startswith('```'):
+            content = content.strip('`')
+            content = content[content.index('\n') + 1:] if '\n' in content else content
+        data = json.loads(content)
+        items = data.get('results') if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError(f"回复格式不符: {content[:200]}")
+        return {item['doi']: {key: value for key, value in item.items() if key != 'doi'}
+                for item in items if isinstance(item, dict) and item.get('doi')}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class ArticleSink:
+    """
+    追加写入的文章信息输出
+
+    每页文章解析后立即追加到articles_info.jsonl和articles_info.csv并刷新到磁盘，
+    进程中途退出也不会丢失已翻过的页面，内存占用与结果数无关。
+    可选gzip或zstd压缩：每页写成一个完整的gzip成员或zstd帧，进程中断最多留下一个不完整的尾段，
+    追加打开时先截掉该尾段再继续写入。finalize时可再由JSONL流式生成旧格式的articles_info.json。
+    """
+
+    COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+    def __init__(self, output_dir, compression=None, append=False, metrics=None):
+        """
+        Args:
+            output_dir (str): 输出目录
+            compression (str): 压缩方式，None、'gzip'或'zstd'
+            append (bool): 追加到已有文件（断点续爬、增量爬取时使用），否则覆盖
+            metrics (CrawlMetrics): 记录写入耗时的指标对象
+        """
+        self.metrics = metrics
+        if compression not in self.COMPRESSION_SUFFIXES:
+            raise ValueError(f"不支持的压缩方式: {compression}")
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        suffix = self.COMPRESSION_SUFFIXES[compression]
+        self.jsonl_path = self.output_dir / f"articles_info.jsonl{suffix}"
+        self.csv_path = self.output_dir / f"articles_info.csv{suffix}"
+        self._compressor = None
+        if compression == 'zstd':
+            import zstandard
+            self._compressor = zstandard.ZstdCompressor()
+
+        if append:
+            for path in (self.jsonl_path, self.csv_path):
+                self._truncate_incomplete_tail(path)
+        mode = 'ab' if append else 'wb'
+        write_header = not (append and self.csv_path.exists() and self.csv_path.stat().st_size > 0)
+        self._jsonl_file = open(self.jsonl_path, mode)
+        self._csv_file = open(self.csv_path, mode)
+        # CSV行先写入内存缓冲，每页作为一段整体写出
+        self._csv_buffer = io.StringIO(newline='')
+        self._csv_writer = csv.DictWriter(self._csv_buffer, fieldnames=ARTICLE_FIELDS, extrasaction='ignore')
+        if write_header:
+            self._csv_writer.writeheader()
+            self._write_segment(self._csv_file, self._take_csv())
+        self.count = 0
+
+    def _compress(self, data):
+        """把一段数据压缩成一个独立的gzip成员或zstd帧"""
+        if self.compression == 'gzip':
+            return gzip.compress(data)
+        if self.compression == 'zstd':
+            return self._compressor.compress(data)
+        return data
+
+    def _decoder(self):
+        """创建解压单个gzip成员或zstd帧的解码器"""
+        if self.compression == 'gzip':
+            return zlib.decompressobj(wbits=31)
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    def _iter_segments(self, path, chunk_size=1024 * 1024):
+        """
+        逐个解压压缩文件中完整的段，末尾不完整或损坏的段被忽略
+
+        Yields:
+            tuple: (该段在文件中的结束偏移, 解压后的内容)
+        """
+        offset = 0  # 最后一个完整段的结束偏移
+        consumed = 0  # 当前段已送入解码器的字节数
+        decoder = self._decoder()
+        chunks = []
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(chunk_size)
+                if not data:
+                    if consumed:
+                        logger.warning(f"忽略 {path} 末尾不完整的压缩段（{consumed} 字节）")
+                    return
+                while data:
+                    try:
+                        chunks.append(decoder.decompress(data))
+                    except Exception as e:
+                        logger.warning(f"压缩数据损坏，忽略 {path} 中 {offset} 字节之后的内容: {e}")
+                        return
+                    if not decoder.eof:
+                        consumed += len(data)
+                        break
+                    # 当前段结束，剩余的输入属于下一段
+                    rest = decoder.unused_data
+                    offset += consumed + len(data) - len(rest)
+                    yield offset, b''.join(chunks)
+                    consumed, decoder, chunks, data = 0, self._decoder(), [], rest
+
+    def _take_csv(self):
+        """取出CSV缓冲中的内容"""
+        text = self._csv_buffer.getvalue()
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        return text
+
+    def _write_segment(self, f, text):
+        """把一段文本编码、压缩后写入文件并刷新"""
+        data = text.encode('utf-8')
+        if data:
+            f.write(self._compress(data))
+            f.flush()
+
+    def write_page(self, articles):
+        """写入一页文章并刷新到磁盘"""
+        started = time.perf_counter()
+        lines = []
+        for article in articles:
+            lines.append(json.dumps(article_dict(article), ensure_ascii=False) + '\n')
+            self._csv_writer.writerow(article)
+        self._write_segment(self._jsonl_file, ''.join(lines))
+        self._write_segment(self._csv_file, self._take_csv())
+        self.count += len(articles)
+        if self.metrics is not None:
+            self.metrics.observe('write', time.perf_counter() - started)
+
+    def write_pages(self, pages):
+        """包装逐页产出的生成器，每页在向下游传递前先写入文件"""
+        for articles in pages:
+            self.write_page(articles)
+            yield articles
+
+    def _iter_lines(self):
+        """逐行读取JSONL文件，压缩文件只读取完整的段"""
+        if self.compression is None:
+            with open(self.jsonl_path, encoding='utf-8') as f:
+                yield from f
+            return
+        for _, data in self._iter_segments(self.jsonl_path):
+            yield from data.decode('utf-8').splitlines()
+
+    def iter_articles(self):
+        """逐条读取JSONL中的文章信息，跳过进程中断时写了一半的行或压缩段"""
+        for line in self._iter_lines():
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"跳过不完整的记录: {line[:80]}")
+
+    def _truncate_incomplete_tail(self, path):
+        """截掉进程中断时写了一半的尾部：压缩文件截到最后一个完整的段，未压缩文件截到最后一个换行"""
+        if not path.exists():
+            return
+        size = path.stat().st_size
+        if self.compression is None:
+            # 从文件末尾向前查找最后一个换行
+            valid = 0
+            with open(path, 'rb') as f:
+                position = size
+                while position > 0 and not valid:
+                    step = min(64 * 1024, position)
+                    position -= step
+                    f.seek(position)
+                    index = f.read(step).rfind(b'\n')
+                    if index >= 0:
+                        valid = position + index + 1
+        else:
+            valid = 0
+            for valid, _ in self._iter_segments(path):
+                pass
+        if valid < size:
+            logger.warning(f"截掉进程中断时未写完的 {size - valid} 字节: {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid)
+
+    def close(self):
+        if not self._jsonl_file.closed:
+            self._jsonl_file.close()
+            self._csv_file.close()
+
+    def finalize(self, legacy_json=True):
+        """
+        关闭输出文件，可选地生成旧格式的articles_info.json
+
+        Args:
+            legacy_json (bool): 是否生成articles_info.json（与save_articles_info的格式一致）
+
+        Returns:
+            int: JSONL中的文章总数
+        """
+        self.close()
+        total = 0
+        json_file = self.output_dir / "articles_info.json"
+        if legacy_json:
+            tmp_file = json_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for article in self.iter_articles():
+                    f.write('[\n' if total == 0 else ',\n')
+                    f.write(textwrap.indent(json.dumps(article, indent=2, ensure_ascii=False), '  '))
+                    total += 1
+                f.write('\n]' if total else '[]')
+            os.replace(tmp_file, json_file)
+        else:
+            total = sum(1 for _ in self.iter_articles())
+
+        outputs = [self.jsonl_path, self.csv_path] + ([json_file] if legacy_json else [])
+        logger.info(f"文章信息已保存到: {', '.join(str(p) for p in outputs)}")
+        return total
+
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
+]
+
 
 class CABDigitalLibraryCrawler:
-    def __init__(self, base_url="https://www.cabidigitallibrary.org"):
+    def __init__(self, base_url=DEFAULT_BASE_URL, max_rate=0.5, state_db=None,
+                 parser_backend='html.parser', http_cache=None, scheduler=None, download_chunk_size=256 * 1024,
+                 pdf_store=None, abstract_max_chars=500, enricher=None, download_rate=2.0):
+        """
+        Args:
+            base_url (str): 网站根地址
+            max_rate (float): 每个主机每秒允许的搜索页等请求数（不含PDF下载）
+            state_db (str): 爬取状态数据库路径，None时不记录爬取状态
+            parser_backend (str): 搜索结果页解析后端，见PARSER_BACKENDS
+            http_cache (HTTPCache): 搜索结果页的磁盘缓存，None时不缓存
+            scheduler (RequestScheduler): 自定义的请求调度器，None时按max_rate创建
+            download_chunk_size (int): PDF下载的写入块大小（字节）
+            pdf_store (PDFStore): 按内容寻址的PDF存储，None时直接保存到下载目录
+            abstract_max_chars (int): 摘要保留的最大字符数，None时保留全文
+            enricher (AbstractEnricher): 摘要增强器，None时在需要时按默认配置创建
+            download_rate (float): 每个主机每秒允许的PDF下载请求数，与搜索页的预算相互独立
+        """
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"不支持的解析后端: {parser_backend}，可选: {', '.join(PARSER_BACKENDS)}")
         self.base_url = base_url
-        self.session = requests.Session()
-
-        # 随机选择User-Agent
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
-        ]
-
-        # 设置请求头，模拟真实浏览器访问
-        self.session.headers.update({
-            'User-Agent': random.choice(user_agents),
+        self.parser_backend = parser_backend
+        self.http_cache = http_cache
+        self.session = self._create_session()
+        self.metrics = CrawlMetrics()
+        self.scheduler = scheduler or RequestScheduler(max_rate, download_rate=download_rate)
+        if self.scheduler.observer is None:
+            self.scheduler.observer = self.metrics
+        self.state_store = CrawlStateStore(state_db) if state_db else None
+        self.download_chunk_size = download_chunk_size
+        self.pdf_store = pdf_store
+        self.abstract_max_chars = abstract_max_chars
+        self.enricher = enricher
+        self.articles_data = []
+        # 会话是否已预热，以及verify_access取得的、尚未被爬取使用的第一页响应
+        self._warmed_up = False
+        self._prefetched_pages = {}
+
+    def _create_session(self):
+        """创建带有浏览器请求头的会话"""
+        session = requests.Session()
+
+        # 设置请求头，模拟真实浏览器访问（随机选择User-Agent）
+        session.headers.update({
+            'User-Agent': random.choice(USER_AGENTS),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
             'Accept-Language': 'en-US,en;q=0.9,zh-CN;q=0.8,zh;q=0.7',
             # 'Accept-Encoding': 'gzip, deflate, br',
@@ -47,7 +1770,56 @@ class CABDigitalLibraryCrawler:
             'sec-ch-ua-mobile': '?0',
             'sec-ch-ua-platform': '"MacOS"'
         })
-        self.articles_data = []
+
+        if self.http_cache is not None:
+            adapter = CachingHTTPAdapter(self.http_cache)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        return session
+
+    def _create_worker_session(self):
+        """为工作线程创建独立会话，复用主会话的请求头和Cookie，保持单个长连接，并与主会话共用HTTP缓存"""
+        session = requests.Session()
+        session.headers.update(self.session.headers)
+        session.cookies.update(self.session.cookies)
+        if self.http_cache is not None:
+            adapter = CachingHTTPAdapter(self.http_cache, pool_connections=1, pool_maxsize=1)
+        else:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _request(self, url, session=None, method='GET', download=False, **kwargs):
+        """经请求调度器发送请求；可由本地缓存直接提供的请求不参与限速"""
+        kwargs.setdefault('timeout', 30)
+        session = session or self.session
+        # 只有实际发送请求的会话接入了缓存时，缓存命中才能跳过限速
+        cached = isinstance(session.get_adapter(url), CachingHTTPAdapter)
+        throttle = (not cached or method != 'GET' or kwargs.get('stream')
+                    or not self.http_cache.can_serve(url))
+        response = self.scheduler.request(session, method, url, throttle=throttle, download=download, **kwargs)
+        if getattr(response, 'from_cache', False):
+            self.metrics.inc('cache_hits')
+        if response.status_code == 403:
+            self.metrics.inc('http_403')
+        if not kwargs.get('stream'):
+            self.metrics.inc('bytes_fetched', len(response.content))
+        return response
+
+    def metrics_counters(self):
+        """合并请求调度器的统计，作为指标导出时的附加计数器"""
+        scheduler_metrics = self.scheduler.metrics()
+        return {key: scheduler_metrics[key]
+                for key in ('requests', 'retries', 'throttled', 'errors', 'wait_seconds', 'work_seconds')}
+
+    def report_metrics(self, metrics_file=None):
+        """输出运行汇总报告，并在指定时写入指标文件（.json为JSON，否则为Prometheus文本格式）"""
+        extra = self.metrics_counters()
+        logger.info("运行统计:\n" + self.metrics.summary(extra))
+        if metrics_file:
+            self.metrics.write(metrics_file, extra)
+            logger.info(f"运行指标已写入: {metrics_file}")
 
     def _is_captcha_page(self, soup):
         """检查是否为验证页面"""
@@ -62,71 +1834,131 @@ class CABDigitalLibraryCrawler:
 
         return False
 
-    def get_search_results(self, search_url, max_pages=None):
+    def get_search_results(self, search_url, max_pages=None, incremental=False, resume=False,
+                           parallel=False, max_workers=4):
         """
         获取搜索结果页面的所有文章信息
 
         Args:
             search_url (str): 搜索页面URL
             max_pages (int): 最大页数限制，None为无限制
+            incremental (bool): 增量模式，遇到已爬取过的DOI时停止翻页（需要状态存储）
+            resume (bool): 从上次未完成爬取的翻页进度继续（需要状态存储）
+            parallel (bool): 根据总结果数并发获取所有页面
+            max_workers (int): 并行翻页时的最大并发数
 
         Returns:
             list: 文章信息列表
         """
         articles = []
+        for page_articles in self.iter_search_pages(search_url, max_pages, incremental, resume,
+                                                    parallel, max_workers):
+            articles.extend(page_articles)
+
+        logger.info(f"总共找到 {len(articles)} 篇文章")
+        self.articles_data = articles
+        return articles
+
+    def iter_search_pages(self, search_url, max_pages=None, incremental=False, resume=False,
+                          parallel=False, max_workers=4, session=None, run_started_at=None):
+        """
+        逐页爬取搜索结果的生成器，每解析完一页即产出该页的文章列表
+
+        配置了状态存储时，每页文章在产出前与翻页进度一起提交。搜索结果按
+        EPubDate倒序排列，增量模式下遇到本次爬取开始前已记录的DOI即停止翻页。
+
+        Args:
+            search_url (str): 搜索页面URL
+            max_pages (int): 最大页数限制，None为无限制
+            incremental (bool): 增量模式，只产出新文章并在遇到已爬取过的DOI时停止
+            resume (bool): 从上次未完成爬取的翻页进度继续
+            parallel (bool): 并行翻页，根据第一页的总结果数并发获取其余页面（不支持增量模式）
+            max_workers (int): 并行翻页时的最大并发数
+            session (requests.Session): 串行翻页使用的会话，None时使用主会话；
+                传入时由调用方负责会话预热，403时只替换该会话
+            run_started_at (float): 多个搜索共用的本次爬取开始时间，None时以当前时间开始
+
+        Yields:
+            list: 单页的文章信息列表
+        """
+        store = self.state_store
+        if (incremental or resume) and store is None:
+            raise ValueError("增量爬取和断点续爬需要配置状态存储(state_db)")
+
+        if parallel:
+            if incremental:
+                logger.warning("增量模式需要逐页判断是否停止，改为串行翻页")
+            else:
+                yield from self._iter_search_pages_parallel(search_url, max_pages, resume, max_workers)
+                return
+
         page = 0
+        if store is not None:
+            cursor = store.get_cursor(search_url)
+            # 增量模式下总是接着未完成的爬取继续，否则已提交的新文章会被误判为旧文章而提前停止
+            if cursor and not cursor['completed'] and (resume or incremental):
+                page = cursor['next_page']
+                run_started_at = run_started_at or cursor['run_started_at']
+                logger.info(f"从第 {page + 1} 页恢复爬取")
+            run_started_at = store.start_run(search_url, page, run_started_at)
+
+        if session is None:
+            self._warm_up_session()
+        yield from self._iter_search_pages_serial(search_url, page, max_pages, incremental, run_started_at,
+                                                  session)
+
+    def _iter_search_pages_serial(self, search_url, page=0, max_pages=None, incremental=False,
+                                  run_started_at=None, session=None):
+        """
+        从指定页开始逐页串行翻页，调用前需已完成状态存储的start_run和会话预热
+
+        Args:
+            search_url (str): 搜索页面URL
+            page (int): 起始页码（从0开始）
+            max_pages (int): 最大页数限制，None为无限制
+            incremental (bool): 增量模式
+            run_started_at (float): 本次爬取的开始时间，增量模式据此判断旧文章
+            session (requests.Session): 使用的会话，None时使用主会话
+
+        Yields:
+            list: 单页的文章信息列表
+        """
+        store = self.state_store
+        pages_crawled = 0
         retry_count = 0
         max_retries = 3
 
-        # 首先访问主页建立会话
-        try:
-            logger.info("建立会话连接...")
-            self.session.get(self.base_url, timeout=30)
-            time.sleep(2)
-        except Exception as e:
-            logger.warning(f"无法访问主页: {e}")
-
         while True:
             # 构建当前页面URL
-            if page == 0:
-                current_url = search_url
-            else:
-                # 修改URL中的startPage参数
-                current_url = re.sub(r'startPage=\d+', f'startPage={page * 20}', search_url)
+            current_url = self._page_url(search_url, page)
 
             logger.info(f"正在爬取第 {page + 1} 页: {current_url}")
 
             try:
-                # 随机延迟
-                delay = random.uniform(3, 8)
-                time.sleep(delay)
-
                 # 随机更换User-Agent
                 if random.random() < 0.3:  # 30%概率更换
-                    self._update_user_agent()
-
-                # 添加Referer头
-                if page > 0:
-                    self.session.headers['Referer'] = search_url
+                    self._update_user_agent(session)
 
-                response = self.session.get(current_url, timeout=30)
+                # 添加Referer头（请求节奏和重试由请求调度器控制）
+                headers = {'Referer': search_url} if page > 0 else None
+                response = self._fetch_search_page(current_url, session=session, headers=headers)
 
                 # 检查响应状态
                 if response.status_code == 403:
                     logger.warning("遇到403错误，尝试重新建立会话...")
-                    self._reset_session()
-                    time.sleep(random.uniform(10, 20))
+                    session = self._reset_session(session)
                     retry_count += 1
                     if retry_count >= max_retries:
                         logger.error("多次重试失败，停止爬取")
                         break
+                    self.scheduler.sleep_backoff(retry_count)
                     continue
 
                 response.raise_for_status()
                 retry_count = 0  # 成功后重置重试计数
 
                 # 解析HTML
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = self._parse_html(response.text)
 
                 # 检查是否被重定向到验证页面
                 if self._is_captcha_page(soup):
@@ -138,18 +1970,41 @@ class CABDigitalLibraryCrawler:
 
                 if not article_items:
                     logger.info("没有找到更多文章，停止爬取")
+                    if store is not None:
+                        store.mark_completed(search_url)
                     break
 
-                articles.extend(article_items)
                 logger.info(f"第 {page + 1} 页找到 {len(article_items)} 篇文章")
 
+                reached_seen = False
+                if store is not None:
+                    if incremental:
+                        seen = store.seen_dois([a.get('doi') for a in article_items], before=run_started_at)
+                        reached_seen = bool(seen)
+                        # 本次爬取中已提交过的文章（例如崩溃前）也不再重复产出
+                        known = store.seen_dois([a.get('doi') for a in article_items])
+                        article_items = [a for a in article_items if a.get('doi') not in known]
+                    store.commit_page(search_url, page, article_items)
+
+                if article_items:
+                    yield article_items
+
+                if reached_seen:
+                    logger.info("遇到已爬取过的文章，增量爬取结束")
+                    if store is not None:
+                        store.mark_completed(search_url)
+                    break
+
                 # 检查是否还有下一页
                 if not self._has_next_page(soup):
                     logger.info("已到达最后一页")
+                    if store is not None:
+                        store.mark_completed(search_url)
                     break
 
                 # 检查页数限制
-                if max_pages and page + 1 >= max_pages:
+                pages_crawled += 1
+                if max_pages and pages_crawled >= max_pages:
                     logger.info(f"已达到最大页数限制: {max_pages}")
                     break
 
@@ -161,29 +2016,423 @@ class CABDigitalLibraryCrawler:
                 if retry_count >= max_retries:
                     logger.error("达到最大重试次数，停止爬取")
                     break
-                time.sleep(random.uniform(5, 15))
+                self.scheduler.sleep_backoff(retry_count)
 
-        logger.info(f"总共找到 {len(articles)} 篇文章")
-        self.articles_data = articles
-        return articles
+    def _warm_up_session(self):
+        """访问主页建立会话（每个会话只访问一次，离线回放时不访问网络），返回主页的状态码"""
+        if self._warmed_up or (self.http_cache is not None and self.http_cache.offline):
+            return None
+        try:
+            logger.info("建立会话连接...")
+            response = self._request(self.base_url)
+        except Exception as e:
+            logger.warning(f"无法访问主页: {e}")
+            return None
+        self._warmed_up = response.ok
+        return response.status_code
+
+    def verify_access(self, search_url=DEFAULT_SEARCH_URL):
+        """
+        检查主页和搜索结果第一页能否访问
+
+        主页请求同时完成会话预热；成功取得的第一页响应会保留下来，
+        随后爬取同一搜索时直接使用，不再重复请求。
+
+        Args:
+            search_url (str): 要检查的搜索页面URL
+
+        Returns:
+            dict: {'home_status', 'search_status', 'title', 'total_results', 'articles'}
+        """
+        result = {'home_status': self._warm_up_session(), 'search_status': None, 'title': None,
+                  'total_results': None, 'articles': 0}
+        response = self._request(search_url)
+        result['search_status'] = response.status_code
+        if response.ok:
+            response.encoding = self._detect_encoding(response)
+            doc = self._parse_html(response.text)
+            if self._is_lexbor_node(doc):
+                title_node = doc.css_first('title')
+                result['title'] = title_node.text(strip=True) if title_node else None
+            else:
+                result['title'] = doc.title.get_text(strip=True) if doc.title else None
+            result['total_results'] = self._extract_total_results(doc)
+            result['articles'] = len(self._extract_articles_from_page(doc))
+            self._prefetched_pages[search_url] = response
+        return result
+
+    def _fetch_search_page(self, url, session=None, headers=None):
+        """获取搜索结果页，优先使用verify_access保留的响应"""
+        response = self._prefetched_pages.pop(url, None)
+        if response is not None:
+            logger.info("使用访问检查时已获取的第一页")
+            return response
+        return self._request(url, session=session, headers=headers)
+
+    def fetch_citations(self, dois, session=None):
+        """
+        通过网站的批量引文导出（RIS，含摘要）一次获取多个DOI的完整元数据
+
+        Args:
+            dois (list): DOI列表
+            session (requests.Session): 使用的会话，None时使用主会话
 
-    def _update_user_agent(self):
-        """更新User-Agent"""
-        user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15'
-        ]
-        self.session.headers['User-Agent'] = random.choice(user_agents)
-
-    def _reset_session(self):
-        """重置会话"""
-        self.session.close()
-        self.session = requests.Session()
-        self.__init__(self.base_url)
+        Returns:
+            dict: {小写DOI: 文章信息字段}
+        """
+        data = [('doi', doi) for doi in dois]
+        data += [('format', 'ris'), ('include', 'abs'), ('direct', 'true'), ('downloadFileName', 'citations')]
+        response = self._request(f"{self.base_url}/action/downloadCitation", session=session, method='POST',
+                                 data=data, headers={'Referer': f"{self.base_url}/action/doSearch"})
+        response.raise_for_status()
+        citations = {}
+        for record in parse_ris(response.content.decode('utf-8', errors='replace')):
+            fields = ris_record_fields(record)
+            if fields.get('doi'):
+                citations[fields['doi'].lower()] = fields
+        return citations
+
+    def enrich_from_citations(self, articles, batch_size=50):
+        """
+        用批量引文导出补全文章的卷、期、页码和完整摘要
+
+        搜索结果中没有卷期页码且摘要被截断，逐篇请求详情页会使请求数增加约20倍；
+        引文导出一次请求即可取回batch_size篇文章的完整元数据，按DOI合并回文章信息。
+
+        Args:
+            articles (list): 文章信息列表，原地更新
+            batch_size (int): 每次导出请求包含的DOI数
+
+        Returns:
+            int: 补全了元数据的文章数
+        """
+        by_doi = {}
+        for article in articles:
+            if article.get('doi'):
+                by_doi.setdefault(article['doi'].lower(), []).append(article)
+        keys = list(by_doi)
+        merged = 0
+        for start in range(0, len(keys), max(1, batch_size)):
+            batch = keys[start:start + max(1, batch_size)]
+            try:
+                with self.metrics.timer('citations'):
+                    citations = self.fetch_citations([by_doi[key][0]['doi'] for key in batch])
+            except Exception as e:
+                logger.warning(f"批量引文导出失败（{len(batch)} 篇）: {e}")
+                continue
+            for key in batch:
+                fields = citations.get(key)
+                if not fields:
+                    continue
+                for article in by_doi[key]:
+                    self._merge_citation(article, fields)
+                merged += 1
+        self.metrics.inc('citations_merged', merged)
+        return merged
+
+    @staticmethod
+    def _merge_citation(article, fields):
+        """合并引文字段：卷期页码以引文为准，摘要取较完整的一份，其他字段只补空值"""
+        for key in ('volume', 'issue', 'pages'):
+            if fields.get(key):
+                article[key] = fields[key]
+        if len(fields.get('abstract', '')) > len(article.get('abstract') or ''):
+            article['abstract'] = fields['abstract']
+        for key in ('title', 'authors', 'journal'):
+            if fields.get(key) and not article.get(key):
+                article[key] = fields[key]
+
+    def _iter_with_citations(self, pages, batch_size=50):
+        """包装逐页产出的生成器，整页攒到不超过batch_size个DOI后批量补全引文元数据，再按原顺序向下游传递"""
+        buffered, count = [], 0
+
+        def flush():
+            articles = [article for page_articles in buffered for article in page_articles]
+            self.enrich_from_citations(articles, batch_size)
+            if self.state_store is not None:
+                # 状态存储在翻页时已提交了未补全的元数据
+                self.state_store.update_metadata(articles)
+
+        for page_articles in pages:
+            buffered.append(page_articles)
+            count += sum(1 for article in page_articles if article.get('doi'))
+            # 再加一整页就会超出批量大小时提交，使每批正好对应一次导出请求
+            if count + SEARCH_PAGE_SIZE > batch_size:
+                flush()
+                yield from buffered
+                buffered, count = [], 0
+        if buffered:
+            flush()
+            yield from buffered
+
+    def _normalize_search_urls(self, search_url):
+        """把单个或多个搜索URL/关键词统一为URL列表，关键词按build_search_url转换"""
+        search_urls = [search_url] if isinstance(search_url, str) else list(search_url)
+        return [url if '://' in url else build_search_url(query=url, base_url=self.base_url)
+                for url in search_urls]
+
+    def _iter_query_pages(self, search_urls, max_pages=None, incremental=False, resume=False, max_workers=4):
+        """
+        并发翻页多个搜索，按DOI去重后合并为一个逐页产出的迭代器
+
+        每个搜索在单独的线程中使用独立会话串行翻页，所有请求经同一个请求调度器限速；
+        已在其他搜索中出现过的DOI不再产出。所有搜索共用同一个爬取开始时间，
+        增量模式下一个搜索本次新提交的文章不会被其他搜索误判为旧文章。
+
+        Args:
+            search_urls (list): 搜索页面URL列表
+            max_pages (int): 每个搜索的最大页数限制，None为无限制
+            incremental (bool): 增量模式
+            resume (bool): 从上次未完成爬取的翻页进度继续
+            max_workers (int): 同时翻页的搜索数
+
+        Yields:
+            list: 单页中首次出现的文章信息列表
+        """
+        results = queue.Queue(maxsize=max(1, max_workers) * 2)
+        stop = threading.Event()
+        finished = object()
+
+        def put(item):
+            # 下游停止消费时放弃等待，避免翻页线程一直阻塞
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        run_started_at = time.time()
+        store = self.state_store
+        if store is not None and (incremental or resume):
+            # 恢复未完成的爬取时，以其中最早的开始时间作为本次爬取的开始时间
+            for url in search_urls:
+                cursor = store.get_cursor(url)
+                if cursor and not cursor['completed'] and cursor['run_started_at']:
+                    run_started_at = min(run_started_at, cursor['run_started_at'])
+
+        # 先预热主会话，各搜索的独立会话从主会话复制Cookie
+        self._warm_up_session()
+
+        def crawl_query(url):
+            session = self._create_worker_session()
+            try:
+                for page_articles in self.iter_search_pages(url, max_pages, incremental, resume, session=session,
+                                                            run_started_at=run_started_at):
+                    if not put(page_articles):
+                        return
+            except Exception as e:
+                logger.error(f"搜索爬取失败 {url}: {e}")
+            finally:
+                put(finished)
+                session.close()
+
+        seen = set()
+        duplicates = 0
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='query')
+        try:
+            for url in search_urls:
+                executor.submit(crawl_query, url)
+            remaining = len(search_urls)
+            while remaining:
+                page_articles = results.get()
+                self.metrics.set_queue_depth('query_pages', results.qsize())
+                if page_articles is finished:
+                    remaining -= 1
+                    continue
+                unique = []
+                for article in page_articles:
+                    doi = article.get('doi')
+                    if doi:
+                        if doi in seen:
+                            duplicates += 1
+                            continue
+                        seen.add(doi)
+                    unique.append(article)
+                yield unique
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+            self.metrics.inc('duplicate_articles', duplicates)
+            logger.info(f"{len(search_urls)} 个搜索共 {len(seen)} 篇不重复的文章，跳过重复 {duplicates} 篇")
+
+    def _page_url(self, search_url, page):
+        """构建第page页（从0开始）的搜索结果URL"""
+        if page == 0:
+            return search_url
+        # 修改URL中的startPage参数，URL中没有时追加
+        if START_PAGE_PATTERN.search(search_url):
+            return START_PAGE_PATTERN.sub(f'startPage={page * SEARCH_PAGE_SIZE}', search_url)
+        separator = '&' if urlparse(search_url).query else '?'
+        return f"{search_url}{separator}startPage={page * SEARCH_PAGE_SIZE}"
+
+    def _iter_search_pages_parallel(self, search_url, max_pages=None, resume=False, max_workers=4):
+        """
+        并行翻页：先获取第一页并读取总结果数，据此算出所有页面的startPage偏移，
+        再由线程池在全局限速下并发获取，结果按页码顺序产出
+
+        同时在途的页面数不超过max_workers的两倍，消费方处理较慢时不会无限预取。
+        某一页重试后仍然失败时停止产出后续页面，保证状态存储中的翻页进度连续。
+        """
+        store = self.state_store
+        start_page = 0
+        run_started_at = None
+        if store is not None:
+            cursor = store.get_cursor(search_url)
+            if cursor and not cursor['completed'] and resume:
+                start_page = cursor['next_page']
+                run_started_at = cursor['run_started_at']
+                logger.info(f"从第 {start_page + 1} 页恢复爬取")
+            store.start_run(search_url, start_page, run_started_at)
+
+        self._warm_up_session()
+
+        # 第一页：读取总结果数
+        logger.info(f"正在爬取第 1 页: {search_url}")
+        try:
+            response = self._fetch_search_page(search_url)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"爬取第 1 页时出错: {e}")
+            return
+        first_doc = self._parse_html(response.text)
+        first_items = self._extract_articles_from_page(first_doc)
+        total = self._extract_total_results(first_doc)
+        if not first_items:
+            logger.info("没有找到更多文章，停止爬取")
+            if store is not None:
+                store.mark_completed(search_url)
+            return
+        if total is None:
+            logger.warning("无法从第一页读取总结果数，改为串行翻页")
+            next_page = start_page
+            if start_page == 0:
+                logger.info(f"第 1 页找到 {len(first_items)} 篇文章")
+                if store is not None:
+                    store.commit_page(search_url, 0, first_items)
+                yield first_items
+                if not self._has_next_page(first_doc):
+                    logger.info("已到达最后一页")
+                    if store is not None:
+                        store.mark_completed(search_url)
+                    return
+                if max_pages == 1:
+                    logger.info(f"已达到最大页数限制: {max_pages}")
+                    return
+                next_page = 1
+                max_pages = max_pages - 1 if max_pages else max_pages
+            yield from self._iter_search_pages_serial(search_url, next_page, max_pages)
+            return
+
+        total_pages = math.ceil(total / SEARCH_PAGE_SIZE)
+        last_page = total_pages if not max_pages else min(total_pages, start_page + max_pages)
+        logger.info(f"共 {total} 条结果，{total_pages} 页，本次获取第 {start_page + 1} 至 {last_page} 页")
+
+        if start_page == 0:
+            logger.info(f"第 1 页找到 {len(first_items)} 篇文章")
+            if store is not None:
+                store.commit_page(search_url, 0, first_items)
+            yield first_items
+            start_page = 1
+
+        local = threading.local()
+        worker_sessions = []
+        sessions_lock = threading.Lock()
+
+        def fetch_page(page):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = self._create_worker_session()
+                with sessions_lock:
+                    worker_sessions.append(session)
+            response = self._request(self._page_url(search_url, page), session=session,
+                                     headers={'Referer': search_url})
+            response.raise_for_status()
+            return self._extract_articles_from_page(self._parse_html(response.text))
+
+        window = max(1, max_workers) * 2
+        pending = {}
+        next_submit = start_page
+        completed = True
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='search-page')
+        try:
+            for page in range(start_page, last_page):
+                while next_submit < last_page and next_submit < page + window:
+                    pending[next_submit] = executor.submit(fetch_page, next_submit)
+                    next_submit += 1
+                self.metrics.set_queue_depth('search_pages', len(pending))
+                try:
+                    items = pending.pop(page).result()
+                except Exception as e:
+                    logger.error(f"爬取第 {page + 1} 页时出错，停止爬取: {e}")
+                    completed = False
+                    break
+                logger.info(f"第 {page + 1}/{total_pages} 页找到 {len(items)} 篇文章")
+                if store is not None:
+                    store.commit_page(search_url, page, items)
+                if items:
+                    yield items
+        finally:
+            for future in pending.values():
+                future.cancel()
+            executor.shutdown(wait=True)
+            for session in worker_sessions:
+                session.close()
+
+        if completed and last_page >= total_pages:
+            logger.info("已到达最后一页")
+            if store is not None:
+                store.mark_completed(search_url)
+
+    def _extract_total_results(self, doc):
+        """从搜索结果页读取总结果数，找不到时返回None"""
+        if self._is_lexbor_node(doc):
+            count_elem = doc.css_first('.result__count')
+            count_text = count_elem.text() if count_elem else ''
+            page_text = doc.body.text(separator=' ') if doc.body else ''
+        else:
+            count_elem = doc.select_one('.result__count')
+            count_text = count_elem.get_text() if count_elem else ''
+            page_text = doc.get_text(' ')
+
+        # 计数文本形如"1 - 20 of 1,234 results"，取"of"之后的数字，否则取最后一个数字
+        match = RESULT_COUNT_OF_PATTERN.search(count_text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        numbers = RESULT_NUMBER_PATTERN.findall(count_text)
+        if numbers:
+            return int(numbers[-1].replace(',', ''))
+        match = RESULT_COUNT_PATTERN.search(page_text)
+        if match:
+            return int(match.group(1).replace(',', ''))
+        return None
+
+    def _update_user_agent(self, session=None):
+        """更新User-Agent，session为None时更新主会话"""
+        (session or self.session).headers['User-Agent'] = random.choice(USER_AGENTS)
+
+    def _reset_session(self, session=None):
+        """
+        重置会话（保留爬虫的其他配置和已爬取的数据）
+
+        Args:
+            session (requests.Session): 要替换的独立会话，None时重置主会话
+
+        Returns:
+            requests.Session: 替换后的独立会话，重置主会话时返回None
+        """
+        if session is None or session is self.session:
+            self.session.close()
+            self.session = self._create_session()
+            self._warmed_up = False
+            logger.info("会话已重置")
+            return None
+        # 独立会话只由当前线程使用，可以直接关闭并换成新会话
+        session.close()
+        session = self._create_session()
         logger.info("会话已重置")
+        return session
 
     def _detect_encoding(self, response):
         """检测并设置正确的编码"""
@@ -222,45 +2471,66 @@ class CABDigitalLibraryCrawler:
         # 4. 默认使用utf-8，忽略错误
         return 'utf-8'
 
+    def _parse_html(self, html, backend=None):
+        """
+        使用指定的解析后端解析HTML
+
+        Args:
+            html (str): 页面HTML
+            backend (str): 解析后端，None时使用爬虫配置的后端
+
+        Returns:
+            BeautifulSoup或LexborHTMLParser文档对象
+        """
+        backend = backend or self.parser_backend
+        with self.metrics.timer('parse'):
+            if backend == 'selectolax':
+                from selectolax.lexbor import LexborHTMLParser
+                return LexborHTMLParser(html)
+            from bs4 import BeautifulSoup
+            return BeautifulSoup(html, backend)
+
+    @staticmethod
+    def _is_lexbor_node(doc):
+        """判断文档对象是否由selectolax解析得到"""
+        return type(doc).__module__.startswith('selectolax')
+
     def _extract_articles_from_page(self, soup):
         """从页面中提取文章信息"""
+        started = time.perf_counter()
         articles = []
 
         # 查找文章条目 - 根据实际HTML结构选择器
-        article_elements = soup.find_all('li', class_='search__item')
+        if self._is_lexbor_node(soup):
+            article_elements = soup.css('li.search__item')
+            extract = self._extract_article_info_lexbor
+        else:
+            article_elements = soup.find_all('li', class_='search__item')
+            extract = self._extract_article_info
 
         for element in article_elements:
             try:
-                article_info = self._extract_article_info(element)
+                article_info = extract(element)
                 if article_info:
                     articles.append(article_info)
             except Exception as e:
                 logger.warning(f"提取文章信息时出错: {e}")
                 continue
 
+        self.metrics.observe('extract', time.perf_counter() - started)
+        self.metrics.inc('pages')
+        self.metrics.inc('articles', len(articles))
         return articles
 
     def _extract_article_info(self, element):
         """从单个文章元素中提取信息"""
-        article_info = {
-            'title': '',
-            'authors': '',
-            'publication_date': '',
-            'doi': '',
-            'abstract': '',
-            'pdf_url': '',
-            'article_url': '',
-            'journal': '',
-            'volume': '',
-            'issue': '',
-            'pages': ''
-        }
+        article_info = Article()
 
         try:
             # 提取标题
             title_elem = element.find('h4')
             if title_elem:
-                article_info['title'] = self._safe_get_text(title_elem)
+                article_info.title = self._safe_get_text(title_elem)
 
             # 提取作者
             authors_list = element.find('ul', class_='rlist--inline')
@@ -270,40 +2540,93 @@ class CABDigitalLibraryCrawler:
                     author_name = self._safe_get_text(author_elem)
                     if author_name:
                         authors.append(author_name)
-                article_info['authors'] = ', '.join(authors)
+                article_info.authors = ', '.join(authors)
 
             # 提取DOI和文章URL
             doi_input = element.find('input', {'name': 'doi'})
             if doi_input and doi_input.get('value'):
                 doi = doi_input['value']
-                article_info['doi'] = doi
-                article_info['article_url'] = f"{self.base_url}/doi/{doi}"
+                article_info.doi = doi
+                article_info.article_url = f"{self.base_url}/doi/{doi}"
 
             # 提取PDF链接
             # pdf_link = element.find('a', href=re.compile(r'/doi/epdf/'))
             # if pdf_link:
             #     pdf_href = pdf_link.get('href')
-            #     article_info['pdf_url'] = urljoin(self.base_url, pdf_href)
-            article_info['pdf_url'] = article_info.get('article_url', '').replace('www.cabidigitallibrary.org/doi/','www.cabidigitallibrary.org/doi/pdf/')
+            #     article_info.pdf_url = urljoin(self.base_url, pdf_href)
+            if article_info.doi:
+                article_info.pdf_url = f"{self.base_url}/doi/pdf/{article_info.doi}"
 
             # 提取发布日期
-            date_span = element.find('span', string=re.compile(r'\d{1,2}\s+\w+\s+\d{4}'))
+            date_span = element.find('span', string=DATE_PATTERN)
             if date_span:
-                article_info['publication_date'] = self._safe_get_text(date_span)
+                article_info.publication_date = self._safe_get_text(date_span)
 
             # 提取摘要
             abstract_elem = element.find('span', class_='hlFld-Abstract')
             if abstract_elem:
                 abstract_text = self._safe_get_text(abstract_elem)
-                article_info['abstract'] = abstract_text[:500] if abstract_text else ''
+                article_info.abstract = abstract_text[:self.abstract_max_chars] if abstract_text else ''
 
             # 提取期刊信息
-            journal_elem = element.find('a', href=re.compile(r'/journal/'))
+            journal_elem = element.find('a', href=JOURNAL_HREF_PATTERN)
             if journal_elem:
-                article_info['journal'] = self._safe_get_text(journal_elem)
+                # 期刊名在大量文章间重复，驻留后共用同一个字符串对象
+                article_info.journal = sys.intern(self._safe_get_text(journal_elem))
 
             # 只有当至少有标题时才返回文章信息
-            if article_info['title']:
+            if article_info.title:
+                return article_info
+
+        except Exception as e:
+            logger.warning(f"提取文章信息时出错: {e}")
+
+        return None
+
+    def _extract_article_info_lexbor(self, node):
+        """从单个文章元素中提取信息（selectolax后端，输出与_extract_article_info一致）"""
+        article_info = Article()
+
+        try:
+            title_elem = node.css_first('h4')
+            if title_elem:
+                article_info.title = self._safe_get_node_text(title_elem)
+
+            authors_list = node.css_first('ul.rlist--inline')
+            if authors_list:
+                authors = []
+                for author_elem in authors_list.css('a'):
+                    author_name = self._safe_get_node_text(author_elem)
+                    if author_name:
+                        authors.append(author_name)
+                article_info.authors = ', '.join(authors)
+
+            doi_input = node.css_first('input[name="doi"]')
+            doi = doi_input.attributes.get('value') if doi_input else None
+            if doi:
+                article_info.doi = doi
+                article_info.article_url = f"{self.base_url}/doi/{doi}"
+
+            if article_info.doi:
+                article_info.pdf_url = f"{self.base_url}/doi/pdf/{article_info.doi}"
+
+            # 与BeautifulSoup的find(string=...)语义一致：只匹配仅含单一文本内容的span
+            for span in node.css('span'):
+                string = self._lexbor_string(span)
+                if string is not None and DATE_PATTERN.search(string):
+                    article_info.publication_date = self._safe_get_node_text(span)
+                    break
+
+            abstract_elem = node.css_first('span.hlFld-Abstract')
+            if abstract_elem:
+                abstract_text = self._safe_get_node_text(abstract_elem)
+                article_info.abstract = abstract_text[:self.abstract_max_chars] if abstract_text else ''
+
+            journal_elem = node.css_first('a[href*="/journal/"]')
+            if journal_elem:
+                article_info.journal = sys.intern(self._safe_get_node_text(journal_elem))
+
+            if article_info.title:
                 return article_info
 
         except Exception as e:
@@ -311,28 +2634,104 @@ class CABDigitalLibraryCrawler:
 
         return None
 
+    @staticmethod
+    def _lexbor_string(node):
+        """模拟BeautifulSoup的Tag.string：节点只有一个子节点时递归取其文本，否则返回None"""
+        while True:
+            children = list(node.iter(include_text=True))
+            if len(children) != 1:
+                return None
+            node = children[0]
+            if node.tag == '-text':
+                return node.text(deep=False)
+
     def _safe_get_text(self, element):
-        """安全地获取元素文本，处理编码问题"""
+        """安全地获取元素文本，多个空白字符合并为单个空格"""
+        try:
+            # 解析器产出的已是合法的str，不需要再做编码往返
+            return WHITESPACE_PATTERN.sub(' ', element.get_text(strip=True))
+        except Exception:
+            return ""
+
+    def _safe_get_node_text(self, node):
+        """安全地获取selectolax节点文本，处理方式与_safe_get_text一致"""
         try:
-            text = element.get_text(strip=True)
-            # 清理文本中的特殊字符
-            text = re.sub(r'\s+', ' ', text)  # 替换多个空白字符为单个空格
-            text = text.encode('utf-8', errors='ignore').decode('utf-8')  # 清理无法编码的字符
-            return text
+            return WHITESPACE_PATTERN.sub(' ', node.text(deep=True, separator='', strip=True))
         except Exception:
             return ""
 
     def _has_next_page(self, soup):
         """检查是否有下一页"""
+        if self._is_lexbor_node(soup):
+            for link in soup.css('a'):
+                string = self._lexbor_string(link)
+                attributes = link.attributes
+                classes = (attributes.get('class') or '').split()
+                if (string is not None and NEXT_PATTERN.search(string)) or \
+                        any(NEXT_PATTERN.search(c) for c in classes) or \
+                        NEXT_PATTERN.search(attributes.get('aria-label') or ''):
+                    return True
+            return False
+
         # 查找下一页链接
-        next_link = soup.find('a', string=re.compile(r'next', re.I)) or \
-                    soup.find('a', class_=re.compile(r'next', re.I)) or \
-                    soup.find('a', {'aria-label': re.compile(r'next', re.I)})
+        next_link = soup.find('a', string=NEXT_PATTERN) or \
+                    soup.find('a', class_=NEXT_PATTERN) or \
+                    soup.find('a', {'aria-label': NEXT_PATTERN})
 
         return next_link is not None
 
-    def download_pdf(self, pdf_url, save_path, filename=None):
-        """下载单个PDF文件"""
+    def compare_parser_backends(self, html, backends=PARSER_BACKENDS):
+        """
+        用多个解析后端解析同一页面并比较提取结果，用于验证后端之间的一致性
+
+        Args:
+            html (str): 搜索结果页HTML
+            backends (tuple): 参与比较的解析后端，第一个作为基准
+
+        Returns:
+            list: 不一致之处的描述列表，为空表示完全一致
+        """
+        results = {}
+        for backend in backends:
+            doc = self._parse_html(html, backend)
+            results[backend] = (self._extract_articles_from_page(doc), self._has_next_page(doc))
+
+        reference, (expected, expected_next) = backends[0], results[backends[0]]
+        mismatches = []
+        for backend in backends[1:]:
+            actual, actual_next = results[backend]
+            if len(actual) != len(expected):
+                mismatches.append(f"{backend}: 文章数 {len(actual)} != {reference}: {len(expected)}")
+            for i, (want, got) in enumerate(zip(expected, actual)):
+                for key in ARTICLE_FIELDS:
+                    if want[key] != got[key]:
+                        mismatches.append(f"{backend}: 第{i + 1}篇 {key} {got.get(key)!r} != {want[key]!r}")
+            if actual_next != expected_next:
+                mismatches.append(f"{backend}: 下一页 {actual_next} != {expected_next}")
+        return mismatches
+
+    def download_pdf(self, pdf_url, save_path, filename=None, session=None, chunk_size=None, doi=None):
+        """
+        下载单个PDF文件
+
+        先写入同目录下的<文件名>.part临时文件，校验完整后再原子地重命名为最终文件名，
+        因此最终路径上的文件总是完整的。中断留下的.part文件在下次下载时通过Range请求续传：
+        .part旁的.validator文件记录响应的ETag或Last-Modified，续传时作为If-Range发送，
+        服务器上的文件已变化时会返回完整内容并从头下载；没有校验值的.part文件直接丢弃。
+        完整性依据Content-Length(或Content-Range中的总大小)和%PDF文件头判断。
+        配置了PDF存储时，DOI或链接已在存储中的文章不再下载，只在下载目录中建立链接。
+
+        Args:
+            pdf_url (str): PDF链接
+            save_path (str): 保存目录
+            filename (str): 文件名，None时根据URL生成
+            session (requests.Session): 使用的会话，None时使用主会话
+            chunk_size (int): 写入块大小（字节），None时使用爬虫配置
+            doi (str): 文章DOI，用于在PDF存储中查找和登记
+
+        Returns:
+            bool: 是否成功
+        """
         try:
             if not pdf_url:
                 return False
@@ -345,86 +2744,343 @@ class CABDigitalLibraryCrawler:
 
             filename = self._sanitize_filename(filename)
             file_path = Path(save_path) / filename
-
-            # 检查文件是否已存在
+            part_path = file_path.with_name(file_path.name + '.part')
+            validator_path = part_path.with_name(part_path.name + '.validator')
+            store = self.pdf_store
+
+            if store is not None:
+                sha256 = store.lookup(doi=doi, url=pdf_url)
+                if sha256:
+                    store.link(sha256, file_path)
+                    self.metrics.inc('pdfs_store_hits')
+                    logger.info(f"PDF存储中已存在，跳过下载: {filename}")
+                    return True
+
+            # 检查文件是否已存在（早期版本可能直接写入最终路径，因此仍校验文件头）
             if file_path.exists():
-                logger.info(f"文件已存在，跳过: {filename}")
-                return True
-
-            logger.info(f"下载PDF: {pdf_url}")
-            response = self.session.get(pdf_url, stream=True, timeout=60)
-            response.raise_for_status()
-
-            # 检查内容类型
-            content_type = response.headers.get('content-type', '').lower()
-            if 'pdf' not in content_type and not pdf_url.endswith('.pdf'):
-                logger.warning(f"可能不是PDF文件: {content_type}")
+                if self._has_pdf_header(file_path):
+                    if store is not None and not file_path.is_symlink():
+                        # 把以前直接下载的文件收入存储
+                        store.add(file_path, file_path, doi=doi, url=pdf_url)
+                    logger.info(f"文件已存在，跳过: {filename}")
+                    return True
+                logger.warning(f"已有文件不是有效的PDF，重新下载: {filename}")
+                file_path.unlink()
+
+            # 有未完成的临时文件时从断点续传，If-Range保证只在服务器文件未变化时拼接
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            validator = validator_path.read_text(encoding='utf-8').strip() if validator_path.exists() else ''
+            if offset and not validator:
+                logger.warning(f"临时文件没有校验值，无法确认能否续传，重新下载: {filename}")
+                part_path.unlink()
+                offset = 0
+            headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if offset else None
+
+            logger.info(f"下载PDF: {pdf_url}" + (f"（从 {offset} 字节处续传）" if offset else ""))
+            started = time.perf_counter()
+            response = self._request(pdf_url, session=session, download=True, stream=True, timeout=60,
+                                     headers=headers)
+
+            expected_size = None
+            if response.status_code == 416 and offset:
+                # 请求范围超出文件大小：临时文件可能已经完整
+                response.close()
+                expected_size = self._content_range_total(response.headers.get('Content-Range'))
+            else:
+                response.raise_for_status()
 
-            # 保存文件
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                # 检查内容类型
+                content_type = response.headers.get('content-type', '').lower()
+                if 'pdf' not in content_type and not pdf_url.endswith('.pdf'):
+                    logger.warning(f"可能不是PDF文件: {content_type}")
+
+                if response.status_code == 206:
+                    expected_size = self._content_range_total(response.headers.get('Content-Range'))
+                    mode = 'ab'
+                else:
+                    # 服务器不支持Range或文件已变化(If-Range不匹配)时从头下载
+                    if offset:
+                        logger.info(f"服务器返回完整内容，从头下载: {filename}")
+                    offset = 0
+                    mode = 'wb'
+                    content_length = response.headers.get('Content-Length')
+                    if content_length and content_length.isdigit() and not response.headers.get('Content-Encoding'):
+                        expected_size = int(content_length)
+                    self._save_validator(validator_path, response.headers)
+
+                # 保存到临时文件
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size or self.download_chunk_size):
+                        if chunk:
+                            f.write(chunk)
+
+            file_size = part_path.stat().st_size
+            if expected_size is not None and file_size < expected_size:
+                logger.warning(f"下载不完整，保留临时文件以便续传: {filename} ({file_size}/{expected_size} 字节)")
+                self.metrics.inc('pdfs_failed')
+                return False
+            if (expected_size is not None and file_size > expected_size) or not self._has_pdf_header(part_path):
+                logger.error(f"下载的文件无效，已删除: {filename}")
+                part_path.unlink()
+                validator_path.unlink(missing_ok=True)
+                self.metrics.inc('pdfs_failed')
+                return False
+            validator_path.unlink(missing_ok=True)
 
-            file_size = file_path.stat().st_size
+            if store is not None:
+                _, duplicate = store.add(part_path, file_path, doi=doi, url=pdf_url)
+                if duplicate:
+                    self.metrics.inc('pdfs_deduplicated')
+            else:
+                os.replace(part_path, file_path)
+            self.metrics.observe('download', time.perf_counter() - started)
+            self.metrics.inc('bytes_downloaded', file_size - offset)
+            self.metrics.inc('pdfs_downloaded')
             logger.info(f"下载完成: {filename} ({file_size / 1024 / 1024:.2f} MB)")
             return True
 
         except Exception as e:
+            self.metrics.inc('pdfs_failed')
             logger.error(f"下载PDF失败 {pdf_url}: {e}")
             return False
 
-    def save_articles_info(self, articles, output_dir):
-        """保存文章信息到文件"""
+    @staticmethod
+    def _save_validator(validator_path, headers):
+        """记录续传用的校验值：优先强ETag（If-Range不接受弱ETag），其次Last-Modified，都没有时删除旧记录"""
+        etag = headers.get('ETag', '')
+        validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified', '')
+        if validator:
+            validator_path.write_text(validator, encoding='utf-8')
+        else:
+            validator_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _has_pdf_header(path):
+        """文件是否以%PDF文件头开始"""
+        try:
+            with open(path, 'rb') as f:
+                return f.read(5) == b'%PDF-'
+        except OSError:
+            return False
+
+    @staticmethod
+    def _content_range_total(content_range):
+        """从Content-Range响应头（如 bytes 100-999/1000）中读取文件总大小"""
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1].strip()
+            if total.isdigit():
+                return int(total)
+        return None
+
+    def save_articles_info(self, articles, output_dir, parquet=False):
+        """
+        保存文章信息到文件
+
+        Args:
+            articles (list): 文章信息列表
+            output_dir (str): 输出目录
+            parquet (bool): 是否同时导出按年月分区的Parquet数据集
+        """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 保存为JSON
-        json_file = output_dir / "articles_info.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(articles, f, indent=2, ensure_ascii=False)
-
-        # 保存为CSV
-        csv_file = output_dir / "articles_info.csv"
-        if articles:
-            with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=articles[0].keys())
-                writer.writeheader()
-                writer.writerows(articles)
+        with self.metrics.timer('write'):
+            # 保存为JSON
+            json_file = output_dir / "articles_info.json"
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump([article_dict(article) for article in articles], f, indent=2, ensure_ascii=False)
+
+            # 保存为CSV
+            csv_file = output_dir / "articles_info.csv"
+            if articles:
+                # 标准字段在前，字典记录中的其他字段（如富化结果）按首次出现的顺序追加在后
+                fieldnames = list(ARTICLE_FIELDS)
+                for article in articles:
+                    if not isinstance(article, Article):
+                        fieldnames.extend(key for key in article if key not in fieldnames)
+                with open(csv_file, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(article_dict(article) for article in articles)
 
         logger.info(f"文章信息已保存到: {json_file} 和 {csv_file}")
 
+        if parquet:
+            self.save_articles_parquet(articles, output_dir)
+
+    def save_articles_parquet(self, articles, output_dir, batch_size=10000):
+        """
+        以Parquet列式格式导出文章信息，按发布年月分区(year=YYYY/month=M)
+
+        publication_date解析为日期类型，authors为字符串列表，以DOI为键：
+        数据集中已存在的DOI不再重复写入，每次导出只追加新文件，不改写已有分区。
+        需要安装pyarrow。
+
+        Args:
+            articles (iterable): 文章信息，可以是列表或逐条产出的迭代器
+            output_dir (str): 输出目录，数据集写入其下的articles_parquet目录
+            batch_size (int): 每批写入的文章数
+
+        Returns:
+            int: 本次写入的文章数
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        dataset_dir = Path(output_dir) / "articles_parquet"
+        schema = pa.schema([
+            pa.field('doi', pa.string(), nullable=False),
+            pa.field('title', pa.string()),
+            pa.field('authors', pa.list_(pa.string())),
+            pa.field('publication_date', pa.date32()),
+            pa.field('abstract', pa.string()),
+            pa.field('pdf_url', pa.string()),
+            pa.field('article_url', pa.string()),
+            pa.field('journal', pa.string()),
+            pa.field('volume', pa.string()),
+            pa.field('issue', pa.string()),
+            pa.field('pages', pa.string()),
+            pa.field('year', pa.int16()),
+            pa.field('month', pa.int8()),
+        ])
+        partitioning = ds.partitioning(pa.schema([schema.field('year'), schema.field('month')]), flavor='hive')
+
+        existing_dois = set()
+        if dataset_dir.exists():
+            existing = ds.dataset(dataset_dir, format='parquet', partitioning=partitioning)
+            existing_dois = set(existing.to_table(columns=['doi']).column('doi').to_pylist())
+
+        run_id = uuid.uuid4().hex
+        written = 0
+        articles = iter(articles)
+        while True:
+            batch = list(islice(articles, batch_size))
+            if not batch:
+                break
+
+            columns = {field.name: [] for field in schema}
+            for article in batch:
+                doi = article.get('doi')
+                if not doi or doi in existing_dois:
+                    continue
+                existing_dois.add(doi)
+                published = parse_publication_date(article.get('publication_date'))
+                authors = article.get('authors') or ''
+                columns['doi'].append(doi)
+                columns['authors'].append([a for a in authors.split(', ') if a] if authors else [])
+                columns['publication_date'].append(published)
+                columns['year'].append(published.year if published else None)
+                columns['month'].append(published.month if published else None)
+                for key in ('title', 'abstract', 'pdf_url', 'article_url', 'journal', 'volume', 'issue', 'pages'):
+                    columns[key].append(article.get(key) or '')
+
+            if not columns['doi']:
+                continue
+            table = pa.table(columns, schema=schema)
+            with self.metrics.timer('write'):
+                ds.write_dataset(table, dataset_dir, format='parquet', partitioning=partitioning,
+                                 basename_template=f"part-{run_id}-{written}-{{i}}.parquet",
+                                 existing_data_behavior='overwrite_or_ignore')
+            written += table.num_rows
+
+        logger.info(f"Parquet数据集已更新: {dataset_dir}，新增 {written} 篇文章")
+        return written
+
     def download_all_pdfs(self, articles, save_path, max_concurrent=5):
-        """批量下载所有PDF文件"""
+        """
+        批量下载所有PDF文件
+
+        使用线程池并发下载，每个下载线程持有独立的长连接会话，
+        请求频率由请求调度器按主机控制。进度日志按文章顺序输出。
+
+        Args:
+            articles (list): 文章信息列表
+            save_path (str): 保存目录
+            max_concurrent (int): 最大并发下载数
+
+        Returns:
+            dict: {'success': 成功数, 'failed': 失败数}
+        """
         save_path = Path(save_path)
         save_path.mkdir(parents=True, exist_ok=True)
 
         success_count = 0
         failed_count = 0
+        total = len(articles)
 
-        for i, article in enumerate(articles, 1):
-            if not article.get('pdf_url'):
-                logger.warning(f"[{i}/{len(articles)}] 没有PDF链接: {article.get('title', 'Unknown')}")
-                failed_count += 1
-                continue
-
-            # 生成文件名
-            title = article.get('title', 'unknown')
-            filename = f"{i:04d}_{self._sanitize_filename(title)}.pdf"
+        local = threading.local()
+        worker_sessions = []
+        sessions_lock = threading.Lock()
 
-            logger.info(f"[{i}/{len(articles)}] 处理: {title}")
+        def download_job(i, article):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = self._create_worker_session()
+                with sessions_lock:
+                    worker_sessions.append(session)
+            return self._download_article(i, article, save_path, session)
 
-            if self.download_pdf(article['pdf_url'], save_path, filename):
-                success_count += 1
-            else:
-                failed_count += 1
+        executor = ThreadPoolExecutor(max_workers=max(1, max_concurrent), thread_name_prefix='pdf-download')
+        try:
+            jobs = []
+            for i, article in enumerate(articles, 1):
+                if not article.get('pdf_url'):
+                    jobs.append((i, article, None))
+                    continue
 
-            # 添加延迟
-            time.sleep(1)
+                jobs.append((i, article, executor.submit(download_job, i, article)))
+
+            # 按提交顺序汇总结果，保证进度日志的顺序稳定
+            for i, article, future in jobs:
+                title = article.get('title', 'Unknown')
+                if future is None:
+                    logger.warning(f"[{i}/{total}] 没有PDF链接: {title}")
+                    failed_count += 1
+                elif future.result():
+                    logger.info(f"[{i}/{total}] 处理完成: {title}")
+                    success_count += 1
+                else:
+                    logger.info(f"[{i}/{total}] 处理失败: {title}")
+                    failed_count += 1
+        finally:
+            executor.shutdown(wait=True)
+            for session in worker_sessions:
+                session.close()
 
         logger.info(f"PDF下载完成! 成功: {success_count}, 失败: {failed_count}")
         return {'success': success_count, 'failed': failed_count}
 
+    def _download_article(self, index, article, save_path, session=None):
+        """下载单篇文章的PDF，并在状态存储中记录下载状态"""
+        store = self.state_store
+        doi = article.get('doi')
+        filename = self._pdf_filename(index, article)
+
+        if store is not None and doi:
+            record = store.get_download(doi)
+            if record and record[0] == 'downloaded' and record[1] and self._has_pdf_header(record[1]):
+                logger.info(f"已下载过，跳过: {doi}")
+                return True
+
+        ok = self.download_pdf(article['pdf_url'], save_path, filename, session=session, doi=doi)
+
+        if store is not None and doi:
+            store.set_download(doi, 'downloaded' if ok else 'failed', Path(save_path) / filename if ok else None)
+        return ok
+
+    def _pdf_filename(self, index, article):
+        """
+        生成PDF文件名
+
+        有DOI时按DOI命名，保证同一篇文章在不同批次的爬取中文件名不变；
+        没有DOI时退回到序号加标题的命名方式。
+        """
+        doi = article.get('doi')
+        if doi:
+            return f"{self._sanitize_filename(doi)}.pdf"
+        title = article.get('title', 'unknown')
+        return f"{index:04d}_{self._sanitize_filename(title)}.pdf"
+
     def _sanitize_filename(self, filename):
         """清理文件名"""
         # 移除非法字符
@@ -436,114 +3092,848 @@ class CABDigitalLibraryCrawler:
             filename = name[:200 - len(ext)] + ext
         return filename
 
-    def crawl_and_download(self, search_url, output_dir="./cab_downloads", max_pages=None, download_pdfs=True):
-        """完整的爬取和下载流程"""
+    def extract_pdf_texts(self, pdf_dir, text_dir, max_workers=None):
+        """
+        用进程池并行提取下载目录中所有PDF的全文和页数
+
+        每个PDF的全文写入text_dir/<PDF文件名>.txt（有DOI时即按DOI命名），
+        页数等信息记录在text_dir/text_index.json中。结果按文件内容哈希缓存，
+        再次运行时只处理新增或内容变化的PDF，内容相同的多个文件只提取一次。
+        需要安装pypdf。
+
+        Args:
+            pdf_dir (str): PDF所在目录
+            text_dir (str): 全文输出目录
+            max_workers (int): 进程数，None时使用CPU核数
+
+        Returns:
+            dict: {'extracted': 新提取数, 'cached': 命中缓存数, 'failed': 失败数}
+        """
+        # 在主进程中提前检查依赖，而不是在每个子进程中失败
+        if importlib.util.find_spec('pypdf') is None:
+            raise ImportError("提取PDF全文需要安装pypdf: pip install pypdf")
+
+        pdf_dir, text_dir = Path(pdf_dir), Path(text_dir)
+        text_dir.mkdir(parents=True, exist_ok=True)
+        index_file = text_dir / "text_index.json"
+        try:
+            index = json.loads(index_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            index = {'objects': {}, 'files': {}}
+
+        # 按内容哈希分组，同一内容只提取一次
+        by_hash = {}
+        for pdf_path in sorted(pdf_dir.glob('*.pdf')):
+            by_hash.setdefault(file_sha256(pdf_path), []).append(pdf_path)
+
+        counts = {'extracted': 0, 'cached': 0, 'failed': 0}
+        pending = {}
+        for sha256, paths in by_hash.items():
+            cached = sha256 in index['objects'] and all(
+                index['files'].get(path.name) == sha256 and (text_dir / f"{path.stem}.txt").exists()
+                for path in paths)
+            if cached:
+                counts['cached'] += len(paths)
+            else:
+                pending[sha256] = paths
+
+        if pending:
+            logger.info(f"提取PDF全文: {len(pending)} 个文件，{counts['cached']} 个命中缓存")
+            with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                futures = {executor.submit(extract_pdf_text, str(paths[0])): sha256
+                           for sha256, paths in pending.items()}
+                for future, sha256 in futures.items():
+                    paths = pending[sha256]
+                    try:
+                        text, page_count, elapsed = future.result()
+                    except Exception as e:
+                        logger.warning(f"提取PDF全文失败 {paths[0].name}: {e}")
+                        counts['failed'] += len(paths)
+                        continue
+                    self.metrics.observe('pdf_text', elapsed)
+                    for path in paths:
+                        text_file = text_dir / f"{path.stem}.txt"
+                        tmp_file = text_file.with_suffix('.txt.tmp')
+                        tmp_file.write_text(text, encoding='utf-8')
+                        os.replace(tmp_file, text_file)
+                        index['files'][path.name] = sha256
+                    index['objects'][sha256] = {'pages': page_count, 'chars': len(text)}
+                    counts['extracted'] += len(paths)
+
+            tmp_index = index_file.with_suffix('.json.tmp')
+            tmp_index.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp_index, index_file)
+
+        self.metrics.inc('pdf_texts_extracted', counts['extracted'])
+        logger.info(f"全文提取完成: 新提取 {counts['extracted']}，缓存 {counts['cached']}，失败 {counts['failed']}")
+        return counts
+
+    def enrich_articles(self, articles, output_file):
+        """
+        对文章摘要做分类和总结，结果按DOI逐行写入JSONL文件
+
+        Args:
+            articles (iterable): 文章信息
+            output_file (str): 输出文件路径
+
+        Returns:
+            int: 写入的结果数
+        """
+        if self.enricher is None:
+            self.enricher = AbstractEnricher(Path(output_file).parent / "enrichment_cache.db", metrics=self.metrics)
+        elif self.enricher.metrics is None:
+            self.enricher.metrics = self.metrics
+
+        results = self.enricher.enrich(articles)
+        output_file = Path(output_file)
+        tmp_file = output_file.with_suffix('.jsonl.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for doi, result in results.items():
+                f.write(json.dumps({'doi': doi, **result}, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, output_file)
+        logger.info(f"摘要增强结果已保存到: {output_file}")
+        return len(results)
+
+    def seed_work_queue(self, work_queue, search_url, max_pages=None, download_pdfs=True):
+        """
+        为分布式爬取初始化工作队列：为每个搜索加入第一页任务
+
+        后续页面由处理第一页的节点根据总结果数加入（读不到总数时逐页跟随下一页链接），
+        解析出的新文章再各自加入PDF下载任务。重复初始化不会产生重复任务。
+
+        Args:
+            work_queue (WorkQueue): 工作队列
+            search_url (str|list): 搜索页面URL或关键词，也可以是它们的列表
+            max_pages (int): 每个搜索的最大页数限制，None为无限制
+            download_pdfs (bool): 是否为新文章加入下载任务
+
+        Returns:
+            int: 新加入的任务数
+        """
+        added = 0
+        for url in self._normalize_search_urls(search_url):
+            payload = {'search_url': url, 'page': 0, 'max_pages': max_pages, 'download_pdfs': download_pdfs}
+            added += work_queue.enqueue('page', f"{url}#0", payload)
+        logger.info(f"工作队列已初始化，新加入 {added} 个任务")
+        return added
+
+    def run_worker(self, work_queue, output_dir="./cab_downloads", worker_id=None, threads=1, poll_interval=2):
+        """
+        工作节点模式：从共享队列中领取并执行任务，直到队列中没有待处理或处理中的任务
+
+        同一节点内的多个线程共用请求调度器；多个节点共用队列数据库和输出目录时，
+        每个任务只会由一个节点完成，崩溃节点未完成的任务在租约过期后由其他节点接手。
+
+        Args:
+            work_queue (WorkQueue): 工作队列
+            output_dir (str): 输出目录，PDF保存在其下的pdfs目录
+            worker_id (str): 节点标识，None时使用主机名和进程号
+            threads (int): 本节点同时执行的任务数
+            poll_interval (float): 暂时没有可领取的任务时的轮询间隔（秒）
+
+        Returns:
+            dict: {'page': 完成的页面任务数, 'download': 完成的下载任务数, 'failed': 失败次数}
+        """
+        if worker_id is None:
+            import socket
+            worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        pdf_dir = Path(output_dir) / "pdfs"
+        pdf_dir.mkdir(parents=True, exist_ok=True)
+        counts = {'page': 0, 'download': 0, 'failed': 0}
+        counts_lock = threading.Lock()
+
+        self._warm_up_session()
+
+        def work(owner):
+            session = self._create_worker_session()
+            try:
+                while True:
+                    task = work_queue.claim(owner)
+                    if task is None:
+                        if work_queue.is_drained():
+                            return
+                        time.sleep(poll_interval)
+                        continue
+                    try:
+                        if task['kind'] == 'page':
+                            self._run_page_task(work_queue, task['payload'], session)
+                        elif not self._download_article(0, Article.from_dict(task['payload']), pdf_dir, session):
+                            raise RuntimeError("下载失败")
+                    except Exception as e:
+                        logger.warning(f"任务失败 {task['kind']} {task['key']}（第 {task['attempts']} 次）: {e}")
+                        work_queue.release(task, owner)
+                        with counts_lock:
+                            counts['failed'] += 1
+                        continue
+                    if work_queue.complete(task, owner):
+                        with counts_lock:
+                            counts[task['kind']] += 1
+            finally:
+                session.close()
+
+        logger.info(f"工作节点 {worker_id} 开始领取任务（{threads} 个线程）")
+        with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix='worker') as executor:
+            futures = [executor.submit(work, f"{worker_id}-{n}") for n in range(max(1, threads))]
+            for future in futures:
+                future.result()
+        logger.info(f"工作节点 {worker_id} 完成: 页面 {counts['page']}，下载 {counts['download']}，"
+                    f"失败 {counts['failed']}，队列状态 {work_queue.counts()}")
+        return counts
+
+    def _run_page_task(self, work_queue, payload, session):
+        """执行页面任务：解析文章并合并到队列，加入后续页面和新文章的下载任务"""
+        search_url, page, max_pages = payload['search_url'], payload['page'], payload.get('max_pages')
+        logger.info(f"正在爬取第 {page + 1} 页: {search_url}")
+        headers = {'Referer': search_url} if page > 0 else None
+        response = self._request(self._page_url(search_url, page), session=session, headers=headers)
+        response.raise_for_status()
+        doc = self._parse_html(response.text)
+        articles = self._extract_articles_from_page(doc)
+
+        next_pages = []
+        total = self._extract_total_results(doc) if page == 0 else None
+        if total is not None:
+            # 第一页读到总结果数时一次性加入所有后续页面，便于各节点并行领取
+            last_page = math.ceil(total / SEARCH_PAGE_SIZE)
+            next_pages = range(1, min(last_page, max_pages) if max_pages else last_page)
+        elif articles and (page == 0 or payload.get('follow_next')) and self._has_next_page(doc):
+            if not max_pages or page + 1 < max_pages:
+                next_pages = [page + 1]
+        for next_page in next_pages:
+            work_queue.enqueue('page', f"{search_url}#{next_page}",
+                               dict(payload, page=next_page, follow_next=total is None))
+
+        new_articles = work_queue.add_articles(articles, search_url)
+        if payload.get('download_pdfs', True):
+            for article in new_articles:
+                if article.get('pdf_url'):
+                    work_queue.enqueue('download', article['doi'], article_dict(article))
+        logger.info(f"第 {page + 1} 页找到 {len(articles)} 篇文章，其中 {len(new_articles)} 篇为新文章")
+
+    def export_work_queue(self, work_queue, output_dir, parquet=False):
+        """把各节点合并后的文章导出为articles_info.json/csv，返回文章数"""
+        articles = work_queue.articles()
+        self.save_articles_info(articles, output_dir, parquet=parquet)
+        return len(articles)
+
+    def crawl_and_download(self, search_url, output_dir="./cab_downloads", max_pages=None, download_pdfs=True,
+                           pipeline=False, max_concurrent=5, queue_size=50, incremental=False, resume=False,
+                           stream_output=False, compression=None, legacy_json=True, parquet=False,
+                           parallel_pages=False, page_workers=4, metrics_file=None, pdf_store_dir=None,
+                           extract_text=False, text_workers=None, search_index=False, enrich=False,
+                           query_workers=4, citations=False, citation_batch_size=50):
+        """
+        完整的爬取和下载流程
+
+        传入多个搜索时并发翻页：每个搜索在单独的线程中使用独立的单连接会话串行翻页，
+        所有请求经同一个请求调度器限速（全局请求频率），不同搜索中重复出现的文章按DOI去重，
+        每个PDF只下载一次。
+
+        Args:
+            search_url (str|list): 搜索页面URL或关键词，也可以是它们的列表；关键词按build_search_url转换为URL
+            output_dir (str): 输出目录
+            max_pages (int): 最大页数限制，None为无限制
+            download_pdfs (bool): 是否下载PDF
+            pipeline (bool): 流水线模式，翻页的同时下载已解析文章的PDF
+            max_concurrent (int): 最大并发下载数
+            queue_size (int): 流水线模式下待下载队列的容量，队列满时翻页暂停
+            incremental (bool): 增量模式，遇到已爬取过的文章时停止翻页
+            resume (bool): 从上次未完成爬取的翻页进度继续
+            stream_output (bool): 每页解析后立即追加写入JSONL/CSV，而不是结束时一次性保存
+            compression (str): 流式输出的压缩方式，None、'gzip'或'zstd'
+            legacy_json (bool): 流式输出结束时是否生成articles_info.json
+            parquet (bool): 是否同时导出按年月分区的Parquet数据集
+            parallel_pages (bool): 根据总结果数并发获取所有搜索结果页（只用于单个搜索）
+            page_workers (int): 并行翻页时的最大并发数
+            metrics_file (str): 运行指标输出文件，.json后缀为JSON，其他为Prometheus文本格式
+            pdf_store_dir (str): 按内容寻址的PDF存储目录，多次爬取可共用；pdfs目录中只保留链接
+            extract_text (bool): 下载完成后提取PDF全文和页数，写入texts目录（需要pypdf）
+            text_workers (int): 全文提取的进程数，None时使用CPU核数
+            search_index (bool): 每页解析后按DOI更新search_index.db检索索引
+            enrich (bool): 调用OpenAI兼容接口对摘要做分类和总结，写入articles_enrichment.jsonl（需要openai），
+                同时自动启用citations，对完整摘要而不是搜索结果中截断的摘要做总结
+            query_workers (int): 多个搜索时同时翻页的搜索数
+            citations (bool): 通过批量引文导出补全卷、期、页码和完整摘要
+            citation_batch_size (int): 每次引文导出请求包含的DOI数
+
+        Returns:
+            dict: {'articles': 保存的文章数, 'success': PDF下载成功数, 'failed': PDF下载失败数}，
+                没有找到任何文章时返回None
+        """
         logger.info("开始爬取CAB Digital Library...")
 
         # 创建输出目录
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        if (incremental or resume) and self.state_store is None:
+            self.state_store = CrawlStateStore(output_dir / "crawl_state.db")
+        store = self.state_store
+        if pdf_store_dir and self.pdf_store is None:
+            self.pdf_store = PDFStore(pdf_store_dir)
+
+        sink = None
+        if stream_output:
+            sink = ArticleSink(output_dir, compression=compression, append=incremental or resume,
+                               metrics=self.metrics)
+
+        if enrich and not citations:
+            # 搜索结果中的摘要是截断的，对截断的文本做总结既不完整，结果还会按截断摘要的哈希缓存
+            logger.info("摘要增强需要完整摘要，自动启用批量引文导出")
+            citations = True
+
         # 爬取文章信息
-        articles = self.get_search_results(search_url, max_pages)
+        search_urls = self._normalize_search_urls(search_url)
+        if len(search_urls) == 1:
+            pages = self.iter_search_pages(search_urls[0], max_pages, incremental, resume, parallel_pages,
+                                           page_workers)
+        else:
+            if parallel_pages:
+                logger.warning("多个搜索时各搜索之间并发、搜索内部串行翻页，忽略并行翻页选项")
+            pages = self._iter_query_pages(search_urls, max_pages, incremental, resume, query_workers)
+        if citations:
+            pages = self._iter_with_citations(pages, citation_batch_size)
+        if sink is not None:
+            pages = sink.write_pages(pages)
+        index = SearchIndex(output_dir / "search_index.db") if search_index else None
+        if index is not None:
+            pages = index.index_pages(pages)
+
+        # 流式输出时只有在还需要批量下载的情况下才在内存中保留文章列表
+        keep_articles = sink is None or (download_pdfs and not pipeline and store is None)
+        downloads = {'success': 0, 'failed': 0}
+        try:
+            if pipeline and download_pdfs:
+                articles, downloads = self._crawl_pipelined(pages, output_dir / "pdfs", max_concurrent, queue_size,
+                                                 search_url=search_urls, keep_articles=keep_articles)
+            else:
+                articles = []
+                found = 0
+                for page_articles in pages:
+                    found += len(page_articles)
+                    if keep_articles:
+                        articles.extend(page_articles)
+                logger.info(f"总共找到 {found} 篇文章")
+        finally:
+            if sink is not None:
+                sink.close()
+            if index is not None:
+                logger.info(f"检索索引共 {index.count()} 篇文章: {index.db_path}")
+                index.close()
+        if keep_articles:
+            self.articles_data = articles
+
+        if store is not None:
+            # 状态存储中还包含历史批次和崩溃前已提交的文章，导出和下载以其为准
+            if incremental and not (sink.count if sink is not None else articles):
+                logger.info("没有发现新文章")
+            if sink is None:
+                articles = store.articles(search_urls)
 
-        if not articles:
+        # 保存文章信息
+        if sink is not None:
+            saved = sink.finalize(legacy_json=legacy_json)
+            if not saved:
+                logger.error("没有找到任何文章")
+                return None
+            if parquet:
+                self.save_articles_parquet(sink.iter_articles(), output_dir)
+        elif not articles:
             logger.error("没有找到任何文章")
-            return
+            return None
+        else:
+            saved = len(articles)
+            self.save_articles_info(articles, output_dir, parquet=parquet)
 
-        # 保存文章信息
-        self.save_articles_info(articles, output_dir)
+        # 摘要增强
+        if enrich:
+            self.enrich_articles(sink.iter_articles() if sink is not None else articles,
+                                 output_dir / "articles_enrichment.jsonl")
 
         # 下载PDF文件
-        if download_pdfs:
+        if download_pdfs and not pipeline:
             pdf_dir = output_dir / "pdfs"
-            self.download_all_pdfs(articles, pdf_dir)
+            pending = store.articles(search_urls, pending_only=True) if store is not None else articles
+            downloads = self.download_all_pdfs(pending, pdf_dir, max_concurrent=max_concurrent)
 
+        # 提取PDF全文
+        if extract_text and download_pdfs:
+            self.extract_pdf_texts(output_dir / "pdfs", output_dir / "texts", max_workers=text_workers)
+
+        self.report_metrics(metrics_file)
         logger.info(f"爬取完成! 结果保存在: {output_dir}")
+        return {'articles': saved, 'success': downloads['success'], 'failed': downloads['failed']}
 
+    def _crawl_pipelined(self, pages, pdf_dir, max_concurrent, queue_size, search_url=None, keep_articles=True):
+        """
+        流水线爬取：主线程翻页解析，下载线程同时从有界队列中取文章下载PDF
 
-# 使用示例和测试功能
-def test_access():
-    """测试网站访问"""
-    crawler = CABDigitalLibraryCrawler()
+        队列满时主线程阻塞，避免下载速度跟不上时待下载文章在内存中堆积。
+        配置了状态存储时，先补下之前批次中未完成下载的文章。
 
-    # 测试访问主页
-    try:
-        logger.info("测试访问主页...")
-        response = crawler.session.get(crawler.base_url, timeout=30)
-        logger.info(f"主页访问状态: {response.status_code}")
+        Args:
+            pages (iterable): 逐页产出文章列表的迭代器，通常为iter_search_pages
+            pdf_dir (str): PDF保存目录
+            max_concurrent (int): 下载线程数
+            queue_size (int): 待下载队列容量
+            search_url (str|list): 搜索页面URL或URL列表，用于从状态存储中取出未完成的下载
+            keep_articles (bool): 是否在内存中保留并返回爬取到的文章
 
-        # 测试搜索页面
-        search_url = "https://www.cabidigitallibrary.org/action/doSearch?SeriesKey=agrirxiv&startPage=0&sortBy=EPubDate"
-        logger.info("测试访问搜索页面...")
-        time.sleep(3)
-        response = crawler.session.get(search_url, timeout=30)
+        Returns:
+            tuple: (本次爬取到的文章信息列表（keep_articles为False时为空）, {'success': 成功数, 'failed': 失败数})
+        """
+        pdf_dir = Path(pdf_dir)
+        pdf_dir.mkdir(parents=True, exist_ok=True)
 
-        # 处理编码
-        response.encoding = crawler._detect_encoding(response)
+        work_queue = queue.Queue(maxsize=max(1, queue_size))
+        counts = {'success': 0, 'failed': 0}
+        counts_lock = threading.Lock()
 
-        logger.info(f"搜索页面访问状态: {response.status_code}")
+        def download_worker():
+            session = self._create_worker_session()
+            try:
+                while True:
+                    item = work_queue.get()
+                    self.metrics.set_queue_depth('download', work_queue.qsize())
+                    try:
+                        if item is None:
+                            return
+                        i, article = item
+                        title = article.get('title', 'Unknown')
+                        if not article.get('pdf_url'):
+                            logger.warning(f"[{i}] 没有PDF链接: {title}")
+                            ok = False
+                        else:
+                            ok = self._download_article(i, article, pdf_dir, session)
+                            logger.info(f"[{i}] {'处理完成' if ok else '处理失败'}: {title}")
+                        with counts_lock:
+                            counts['success' if ok else 'failed'] += 1
+                    finally:
+                        work_queue.task_done()
+            finally:
+                session.close()
+
+        workers = [threading.Thread(target=download_worker, name=f'pdf-download-{n}', daemon=True)
+                   for n in range(max(1, max_concurrent))]
+        for worker in workers:
+            worker.start()
+
+        articles = []
+        found = 0
+        queued = 0
+        backlog_dois = set()
+        try:
+            if self.state_store is not None and search_url is not None:
+                for article in self.state_store.articles(search_url, pending_only=True):
+                    backlog_dois.add(article.get('doi'))
+                    queued += 1
+                    work_queue.put((queued, article))
+                    self.metrics.set_queue_depth('download', work_queue.qsize())
+            for page_articles in pages:
+                found += len(page_articles)
+                if keep_articles:
+                    articles.extend(page_articles)
+                for article in page_articles:
+                    if article.get('doi') and article['doi'] in backlog_dois:
+                        continue
+                    queued += 1
+                    work_queue.put((queued, article))
+                    self.metrics.set_queue_depth('download', work_queue.qsize())
+        finally:
+            for _ in workers:
+                work_queue.put(None)
+            for worker in workers:
+                worker.join()
+
+        logger.info(f"总共找到 {found} 篇文章")
+        logger.info(f"PDF下载完成! 成功: {counts['success']}, 失败: {counts['failed']}")
+        return articles, counts
 
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title = soup.title.string if soup.title else 'Unknown'
-            # 安全地处理标题文本
-            title = title.encode('utf-8', errors='ignore').decode('utf-8')
-            logger.info(f"页面标题: {title}")
-            return True
-        else:
-            logger.error(f"访问失败，状态码: {response.status_code}")
-            return False
 
+# 使用示例和测试功能
+def test_access(search_url=DEFAULT_SEARCH_URL, crawler=None):
+    """
+    测试网站访问
+
+    Args:
+        search_url (str): 要检查的搜索页面URL
+        crawler (CABDigitalLibraryCrawler): 使用的爬虫，传入时第一页响应保留给随后的爬取复用
+
+    Returns:
+        bool: 搜索页面是否可以正常访问
+    """
+    crawler = crawler or CABDigitalLibraryCrawler()
+    try:
+        result = crawler.verify_access(search_url)
     except Exception as e:
         logger.error(f"访问测试失败: {e}")
         return False
 
+    logger.info(f"主页访问状态: {result['home_status']}")
+    logger.info(f"搜索页面访问状态: {result['search_status']}")
+    if result['search_status'] != 200:
+        logger.error(f"访问失败，状态码: {result['search_status']}")
+        return False
+    logger.info(f"页面标题: {result['title'] or 'Unknown'}，共 {result['total_results']} 条结果，"
+                f"第一页解析出 {result['articles']} 篇文章")
+    return True
+
 
-def main():
-    """主函数 - 包含多种运行模式"""
-    # 模式1: 测试访问
-    print("=== 模式1: 测试网站访问 ===")
-    if not test_access():
-        print("建议:")
-        print("1. 检查网络连接")
-        print("2. 使用代理服务器")
-        print("3. 手动访问网站确认是否需要验证")
-        return
+def check_parser_parity(fixture_dir, backends=PARSER_BACKENDS):
+    """
+    对目录中保存的搜索结果页(*.html)逐一比较各解析后端的提取结果
 
-    # 模式2: 少量测试爬取
-    print("\n=== 模式2: 测试爬取(仅1页) ===")
-    search_url = "https://www.cabidigitallibrary.org/action/doSearch?SeriesKey=agrirxiv&startPage=0&sortBy=EPubDate"
+    Args:
+        fixture_dir (str): 保存的搜索结果页所在目录
+        backends (tuple): 参与比较的解析后端，第一个作为基准
 
+    Returns:
+        bool: 所有页面的提取结果是否一致
+    """
     crawler = CABDigitalLibraryCrawler()
-    try:
-        articles = crawler.get_search_results(search_url, max_pages=1)
-        if articles:
-            print(f"测试成功! 找到 {len(articles)} 篇文章")
-            print("前3篇文章:")
-            for i, article in enumerate(articles[:3], 1):
-                print(f"{i}. {article.get('title', 'No title')}")
+    pages = sorted(Path(fixture_dir).glob('*.html'))
+    if not pages:
+        logger.error(f"目录中没有保存的页面: {fixture_dir}")
+        return False
+
+    consistent = True
+    for page in pages:
+        mismatches = crawler.compare_parser_backends(page.read_text(encoding='utf-8'), backends)
+        if mismatches:
+            consistent = False
+            logger.error(f"{page.name}: 发现 {len(mismatches)} 处不一致")
+            for mismatch in mismatches:
+                logger.error(f"  {mismatch}")
         else:
-            print("没有找到文章，可能需要调整解析策略")
-    except Exception as e:
-        print(f"测试爬取失败: {e}")
-        return
-
-    # 模式3: 询问是否继续完整爬取
-    print(f"\n=== 是否继续完整爬取? ===")
-    choice = input("继续爬取所有页面并下载PDF? (y/n): ").lower()
-
-    if choice == 'y':
-        print("开始完整爬取...")
-        crawler.crawl_and_download(
-            search_url=search_url,
-            output_dir="./downloads",
-            max_pages=None,  # 爬取所有页面
-            download_pdfs=True
-        )
+            logger.info(f"{page.name}: 一致")
+    return consistent
+
+
+def build_search_index(output_dir, db_path=None):
+    """
+    从save_articles_info的输出（articles_info.json）建立或更新检索索引
+
+    Args:
+        output_dir (str): 爬取输出目录
+        db_path (str): 索引数据库路径，None时为output_dir/search_index.db
+
+    Returns:
+        int: 写入索引的文章数
+    """
+    output_dir = Path(output_dir)
+    with open(output_dir / "articles_info.json", encoding='utf-8') as f:
+        articles = json.load(f)
+    index = SearchIndex(db_path or output_dir / "search_index.db")
+    try:
+        count = index.add(articles)
+    finally:
+        index.close()
+    logger.info(f"检索索引已更新: {count} 篇文章")
+    return count
+
+
+def _load_config(path):
+    """读取JSON配置文件，键名与命令行长选项相同（短横线或下划线均可）"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return {key.lstrip('-').replace('-', '_'): value for key, value in config.items()}
+
+
+def build_arg_parser(config=None):
+    """
+    构建命令行解析器
+
+    Args:
+        config (dict): 配置文件中的选项，作为各子命令的默认值（命令行参数优先）
+
+    Returns:
+        argparse.ArgumentParser: 解析器
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='crawler.py', description='CAB Digital Library 爬虫')
+    parser.add_argument('--config', help='JSON配置文件，键名与命令行长选项相同，命令行参数优先')
+    parser.add_argument('--log-level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        help='日志级别')
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    # 各子命令共用的连接选项
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--output', default='./downloads', help='输出目录')
+    common.add_argument('--base-url', default=DEFAULT_BASE_URL, help='网站根地址')
+    common.add_argument('--max-rate', type=float, default=0.5, help='每个主机每秒最大搜索页请求数')
+    common.add_argument('--download-rate', type=float, default=2.0, help='每个主机每秒最大PDF下载请求数')
+    common.add_argument('--parser', default='html.parser', choices=PARSER_BACKENDS, help='搜索结果页解析后端')
+    common.add_argument('--cache-dir', help='搜索结果页的磁盘缓存目录')
+    common.add_argument('--offline', action='store_true', help='只从缓存回放，不访问网络')
+    common.add_argument('--metrics-file', help='运行指标输出文件（.json为JSON，否则为Prometheus文本格式）')
+
+    crawl = subparsers.add_parser('crawl', parents=[common], help='爬取搜索结果并下载PDF')
+    crawl.add_argument('searches', nargs='*', metavar='SEARCH',
+                       help='搜索页面URL或关键词，可以有多个（默认为agriRxiv的全部预印本）')
+    crawl.add_argument('--verify', action='store_true', help='先检查网站能否访问（第一页响应会被爬取复用）')
+    crawl.add_argument('--max-pages', type=int, help='每个搜索的最大页数')
+    crawl.add_argument('--no-pdfs', action='store_true', help='只爬取文章信息，不下载PDF')
+    crawl.add_argument('--pipeline', action='store_true', help='翻页的同时下载PDF')
+    crawl.add_argument('--max-concurrent', type=int, default=5, help='最大并发下载数')
+    crawl.add_argument('--queue-size', type=int, default=50, help='流水线模式下待下载队列的容量')
+    crawl.add_argument('--incremental', action='store_true', help='增量爬取，遇到已爬取过的文章时停止')
+    crawl.add_argument('--resume', action='store_true', help='从上次未完成的翻页进度继续')
+    crawl.add_argument('--stream', action='store_true', help='每页解析后立即追加写入JSONL/CSV')
+    crawl.add_argument('--compression', choices=('gzip', 'zstd'), help='流式输出的压缩方式')
+    crawl.add_argument('--no-legacy-json', action='store_true', help='流式输出时不生成articles_info.json')
+    crawl.add_argument('--parquet', action='store_true', help='同时导出按年月分区的Parquet数据集')
+    crawl.add_argument('--parallel-pages', action='store_true', help='根据总结果数并发翻页')
+    crawl.add_argument('--page-workers', type=int, default=4, help='并发翻页数')
+    crawl.add_argument('--query-workers', type=int, default=4, help='多个搜索时同时翻页的搜索数')
+    crawl.add_argument('--pdf-store', help='按内容寻址的PDF存储目录')
+    crawl.add_argument('--extract-text', action='store_true', help='下载后提取PDF全文（需要pypdf）')
+    crawl.add_argument('--text-workers', type=int, help='全文提取的进程数')
+    crawl.add_argument('--search-index', action='store_true', help='同时更新全文检索索引')
+    crawl.add_argument('--citations', action='store_true', help='通过批量引文导出补全卷期页码和完整摘要')
+    crawl.add_argument('--citation-batch-size', type=int, default=50, help='每次引文导出的DOI数')
+    crawl.add_argument('--abstract-chars', type=int, default=500, help='摘要保留的最大字符数，0为不截断')
+    crawl.add_argument('--enrich', action='store_true',
+                       help='用OpenAI兼容接口对完整摘要做分类和总结（需要openai，自动启用--citations）')
+    crawl.add_argument('--enrich-model', default='gpt-4o-mini', help='摘要增强使用的模型')
+    crawl.add_argument('--enrich-base-url', help='摘要增强接口地址')
+    crawl.add_argument('--enrich-batch-size', type=int, default=10, help='每个摘要增强请求包含的摘要数')
+
+    download = subparsers.add_parser('download', parents=[common], help='下载已爬取文章中尚未下载的PDF')
+    download.add_argument('--max-concurrent', type=int, default=5, help='最大并发下载数')
+    download.add_argument('--pdf-store', help='按内容寻址的PDF存储目录')
+    download.add_argument('--extract-text', action='store_true', help='下载后提取PDF全文（需要pypdf）')
+    download.add_argument('--text-workers', type=int, help='全文提取的进程数')
+
+    export = subparsers.add_parser('export', parents=[common], help='从爬取状态重新导出文章信息')
+    export.add_argument('--parquet', action='store_true', help='同时导出按年月分区的Parquet数据集')
+    export.add_argument('--search-index', action='store_true', help='同时更新全文检索索引')
+
+    verify = subparsers.add_parser('verify', parents=[common], help='检查网站访问和解析后端一致性')
+    verify.add_argument('--search-url', default=DEFAULT_SEARCH_URL, help='检查的搜索页面URL')
+    verify.add_argument('--fixtures', help='保存的搜索结果页目录，指定时比较各解析后端的提取结果')
+
+    search = subparsers.add_parser('search', help='检索已建立索引的文章')
+    search.add_argument('query', help='检索词，支持FTS5语法，如 title:soil AND authors:smith')
+    search.add_argument('--index', default='./downloads/search_index.db', help='检索索引数据库路径')
+    search.add_argument('--limit', type=int, default=20, help='最多返回的条数')
+    search.add_argument('--build-from', help='检索前先从该输出目录的articles_info.json更新索引')
+
+    worker = subparsers.add_parser('worker', parents=[common], help='从共享工作队列领取并执行爬取任务')
+    worker.add_argument('--queue', help='工作队列数据库路径，通常位于共享文件系统上（必填）')
+    worker.add_argument('--seed', nargs='+', metavar='SEARCH', help='初始化队列的搜索URL或关键词')
+    worker.add_argument('--max-pages', type=int, help='每个搜索的最大页数')
+    worker.add_argument('--no-pdfs', action='store_true', help='只爬取文章信息，不下载PDF')
+    worker.add_argument('--threads', type=int, default=1, help='本节点同时执行的任务数')
+    worker.add_argument('--lease', type=float, default=600, help='任务租约时长（秒）')
+    worker.add_argument('--export', action='store_true', help='队列处理完后导出合并的文章信息')
+
+    if config:
+        # 每个配置项只作为定义了该选项的解析器的默认值：子命令的默认值会覆盖顶层已解析的值，
+        # 顶层选项（如log_level）设到子命令上会使命令行参数失效
+        top_level = {action.dest for action in parser._actions}
+        parser.set_defaults(**{key: value for key, value in config.items() if key in top_level})
+        known = set(top_level)
+        for subparser in subparsers.choices.values():
+            dests = {action.dest for action in subparser._actions} - top_level
+            subparser.set_defaults(**{key: value for key, value in config.items() if key in dests})
+            known |= dests
+        unknown = sorted(set(config) - known)
+        if unknown:
+            logger.warning(f"配置文件中有未知的选项，已忽略: {', '.join(unknown)}")
+    return parser
+
+
+def _crawler_from_args(args):
+    """按命令行选项创建爬虫"""
+    http_cache = HTTPCache(args.cache_dir, offline=args.offline) if args.cache_dir else None
+    pdf_store = PDFStore(args.pdf_store) if getattr(args, 'pdf_store', None) else None
+    abstract_chars = getattr(args, 'abstract_chars', 500)
+    return CABDigitalLibraryCrawler(base_url=args.base_url, max_rate=args.max_rate,
+                                    download_rate=args.download_rate, parser_backend=args.parser,
+                                    http_cache=http_cache, pdf_store=pdf_store,
+                                    abstract_max_chars=abstract_chars or None)
+
+
+def cmd_crawl(args):
+    crawler = _crawler_from_args(args)
+    searches = args.searches or [DEFAULT_SEARCH_URL]
+    if args.verify and not test_access(crawler._normalize_search_urls(searches[0])[0], crawler):
+        return 1
+    if args.enrich:
+        crawler.enricher = AbstractEnricher(Path(args.output) / "enrichment_cache.db", model=args.enrich_model,
+                                            base_url=args.enrich_base_url, batch_size=args.enrich_batch_size,
+                                            metrics=crawler.metrics)
+    result = crawler.crawl_and_download(
+        searches[0] if len(searches) == 1 else searches,
+        output_dir=args.output,
+        max_pages=args.max_pages,
+        download_pdfs=not args.no_pdfs,
+        pipeline=args.pipeline,
+        max_concurrent=args.max_concurrent,
+        queue_size=args.queue_size,
+        incremental=args.incremental,
+        resume=args.resume,
+        stream_output=args.stream,
+        compression=args.compression,
+        legacy_json=not args.no_legacy_json,
+        parquet=args.parquet,
+        parallel_pages=args.parallel_pages,
+        page_workers=args.page_workers,
+        metrics_file=args.metrics_file,
+        extract_text=args.extract_text,
+        text_workers=args.text_workers,
+        search_index=args.search_index,
+        enrich=args.enrich,
+        query_workers=args.query_workers,
+        citations=args.citations,
+        citation_batch_size=args.citation_batch_size,
+    )
+    # 没有找到文章或有PDF下载失败时以非零状态退出
+    return 0 if result and result['failed'] == 0 else 1
+
+
+def cmd_download(args):
+    crawler = _crawler_from_args(args)
+    output_dir = Path(args.output)
+    state_db = output_dir / "crawl_state.db"
+    if state_db.exists():
+        # 有爬取状态时只下载尚未完成的文章，并记录下载结果
+        crawler.state_store = CrawlStateStore(state_db)
+        articles = crawler.state_store.articles(pending_only=True)
     else:
-        print("爬取已取消")
+        json_file = output_dir / "articles_info.json"
+        if not json_file.exists():
+            logger.error(f"没有找到已爬取的文章信息: {json_file}")
+            return 1
+        with open(json_file, encoding='utf-8') as f:
+            articles = [Article.from_dict(article) for article in json.load(f)]
+    logger.info(f"待下载 {len(articles)} 篇文章")
+    result = crawler.download_all_pdfs(articles, output_dir / "pdfs", max_concurrent=args.max_concurrent)
+    if args.extract_text:
+        crawler.extract_pdf_texts(output_dir / "pdfs", output_dir / "texts", max_workers=args.text_workers)
+    crawler.report_metrics(args.metrics_file)
+    return 0 if result['failed'] == 0 else 1
+
+
+def cmd_export(args):
+    crawler = _crawler_from_args(args)
+    output_dir = Path(args.output)
+    state_db = output_dir / "crawl_state.db"
+    if state_db.exists():
+        store = CrawlStateStore(state_db)
+        try:
+            crawler.save_articles_info(store.articles(), output_dir, parquet=args.parquet)
+        finally:
+            store.close()
+    elif args.parquet:
+        with open(output_dir / "articles_info.json", encoding='utf-8') as f:
+            crawler.save_articles_parquet(json.load(f), output_dir)
+    elif not args.search_index:
+        logger.error(f"没有找到爬取状态: {state_db}")
+        return 1
+    if args.search_index:
+        build_search_index(output_dir)
+    return 0
+
+
+def cmd_verify(args):
+    crawler = _crawler_from_args(args)
+    ok = test_access(args.search_url, crawler)
+    if args.fixtures:
+        ok = check_parser_parity(args.fixtures) and ok
+    return 0 if ok else 1
+
+
+def cmd_search(args):
+    if args.build_from:
+        build_search_index(args.build_from, args.index)
+    if not Path(args.index).exists():
+        print(f"索引不存在: {args.index}")
+        return 1
+    index = SearchIndex(args.index)
+    try:
+        started = time.perf_counter()
+        results = index.search(args.query, limit=args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        for i, (article, score) in enumerate(results, 1):
+            print(f"{i}. {article.title}")
+            print(f"   {article.doi}  {article.publication_date}  {article.journal}  得分 {-score:.2f}")
+        print(f"共 {len(results)} 条结果（索引 {index.count()} 篇，耗时 {elapsed:.1f} 毫秒）")
+    finally:
+        index.close()
+    return 0
+
+
+def cmd_worker(args):
+    if not args.queue:
+        logger.error("worker需要指定--queue（命令行或配置文件）")
+        return 2
+    work_queue = WorkQueue(args.queue, lease_seconds=args.lease)
+    crawler = _crawler_from_args(args)
+    try:
+        if args.seed:
+            crawler.seed_work_queue(work_queue, args.seed, max_pages=args.max_pages, download_pdfs=not args.no_pdfs)
+        crawler.run_worker(work_queue, args.output, threads=args.threads)
+        counts = work_queue.counts()
+        failed = sum(statuses.get('failed', 0) for statuses in counts.values())
+        if args.export:
+            failed_pages = counts['page'].get('failed', 0)
+            if not work_queue.is_drained():
+                logger.warning("队列中仍有未完成的任务，跳过导出")
+            elif failed_pages:
+                # 失败的页面之后的页面从未入队，合并的文章信息不完整
+                logger.error(f"有 {failed_pages} 个页面任务失败，合并的文章信息不完整，跳过导出")
+            else:
+                crawler.export_work_queue(work_queue, args.output)
+        crawler.report_metrics(args.metrics_file)
+    finally:
+        work_queue.close()
+    if failed:
+        logger.error(f"有 {failed} 个任务多次尝试后仍然失败")
+        return 1
+    return 0
+
+
+COMMANDS = {
+    'crawl': cmd_crawl,
+    'download': cmd_download,
+    'export': cmd_export,
+    'verify': cmd_verify,
+    'search': cmd_search,
+    'worker': cmd_worker,
+}
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    用法:
+        python crawler.py crawl --max-pages 1 --no-pdfs
+        python crawler.py crawl "soil health" "https://.../action/doSearch?SeriesKey=agrirxiv" --incremental
+        python crawler.py --config crawl.json crawl
+        python crawler.py download --output ./downloads
+        python crawler.py export --output ./downloads --parquet --search-index
+        python crawler.py verify
+        python crawler.py search "title:soil AND abstract:nitrogen"
+        python crawler.py worker --queue /shared/queue.db --output /shared/out --seed "soil health"
+
+    Returns:
+        int: 进程退出码
+    """
+    import argparse
+
+    argv = sys.argv[1:] if argv is None else argv
+    # 先单独读取--config，配置文件中的选项作为默认值，命令行参数仍然优先
+    config_parser = argparse.ArgumentParser(add_help=False)
+    config_parser.add_argument('--config')
+    known, _ = config_parser.parse_known_args(argv)
+    config = _load_config(known.config) if known.config else None
+    args = build_arg_parser(config).parse_args(argv)
+    logger.setLevel(args.log_level)
+    return COMMANDS[args.command](args)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
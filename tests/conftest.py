@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# crawler.py和benchmark.py位于仓库根目录，不是安装包
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
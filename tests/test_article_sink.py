@@ -0,0 +1,60 @@
+"""流式输出在进程中断后追加续写"""
+import csv
+import gzip
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from crawler import ArticleSink
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CRASH_SCRIPT = '''
+import os, sys
+sys.path.insert(0, sys.argv[1])
+from crawler import ArticleSink
+sink = ArticleSink(sys.argv[2], compression=sys.argv[3] or None)
+for page in range(2):
+    sink.write_page([{'title': f'Article {page}-{n}', 'doi': f'10.1/{page}.{n}'} for n in range(20)])
+os._exit(1)  # 模拟进程被杀：不关闭文件
+'''
+
+
+def read_all(path, compression):
+    data = path.read_bytes()
+    if compression == 'gzip':
+        data = gzip.decompress(data)
+    elif compression == 'zstd':
+        import zstandard
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+    return data.decode('utf-8')
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip', 'zstd'])
+def test_resume_after_crash(tmp_path, compression):
+    if compression == 'zstd':
+        pytest.importorskip('zstandard')
+    subprocess.run([sys.executable, '-c', CRASH_SCRIPT, str(ROOT), str(tmp_path), compression or ''])
+
+    # 再模拟一次写到一半被中断：文件末尾留下半个段
+    sink = ArticleSink(tmp_path, compression=compression, append=True)
+    sink.close()
+    partial = sink._compress(b'{"title": "half written", "doi": "10.1/x"}\n')
+    with open(sink.jsonl_path, 'ab') as f:
+        f.write(partial[:len(partial) // 2])
+    with open(sink.csv_path, 'ab') as f:
+        f.write(partial[:len(partial) // 2])
+    assert [a['doi'] for a in sink.iter_articles()][-1] == '10.1/1.19'
+
+    sink = ArticleSink(tmp_path, compression=compression, append=True)
+    sink.write_page([{'title': 'Resumed', 'doi': '10.1/resumed'}])
+    assert sink.finalize() == 41
+
+    articles = json.loads((tmp_path / 'articles_info.json').read_text(encoding='utf-8'))
+    assert [a['doi'] for a in articles][-2:] == ['10.1/1.19', '10.1/resumed']
+    rows = list(csv.DictReader(io.StringIO(read_all(sink.csv_path, compression))))
+    assert len(rows) == 41 and rows[-1]['title'] == 'Resumed'
@@ -0,0 +1,59 @@
+"""命令行子命令的退出状态和配置文件"""
+import json
+
+from benchmark import StandInCABServer
+from crawler import _load_config, build_arg_parser, main
+
+
+def run_crawl(server, tmp_path, *extra):
+    return main(['crawl', server.search_url, '--base-url', server.base_url, '--max-rate', '10000',
+                 '--download-rate', '10000', '--output', str(tmp_path), *extra])
+
+
+def test_crawl_succeeds(tmp_path):
+    with StandInCABServer(total_results=25, pdf_size=4096) as server:
+        assert run_crawl(server, tmp_path) == 0
+    assert len(list((tmp_path / 'pdfs').glob('*.pdf'))) == 25
+
+
+def test_crawl_fails_without_articles(tmp_path):
+    with StandInCABServer(total_results=0) as server:
+        assert run_crawl(server, tmp_path, '--no-pdfs') == 1
+
+
+def test_crawl_fails_when_a_download_fails(tmp_path):
+    def missing_pdf(handler, url):
+        handler.send_response(404)
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+
+    with StandInCABServer(total_results=5) as server:
+        server.add_route('/doi/pdf/10.31220/agriRxiv.2024.00003', missing_pdf)
+        assert run_crawl(server, tmp_path) == 1
+        assert run_crawl(server, tmp_path / 'pipelined', '--pipeline') == 1
+
+
+def test_command_line_overrides_config(tmp_path):
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps({'log-level': 'ERROR', 'max_pages': 3, 'output': 'from-config'}))
+    config = _load_config(config_file)
+
+    args = build_arg_parser(config).parse_args(['--log-level', 'DEBUG', 'crawl', '--output', 'from-cli'])
+    assert (args.log_level, args.max_pages, args.output) == ('DEBUG', 3, 'from-cli')
+    args = build_arg_parser(config).parse_args(['crawl'])
+    assert (args.log_level, args.output) == ('ERROR', 'from-config')
+
+
+def test_worker_fails_when_tasks_fail(tmp_path):
+    def missing_pdf(handler, url):
+        handler.send_response(404)
+        handler.send_header('Content-Length', '0')
+        handler.end_headers()
+
+    with StandInCABServer(total_results=5) as server:
+        server.add_route('/doi/pdf/10.31220/agriRxiv.2024.00003', missing_pdf)
+        argv = ['worker', '--queue', str(tmp_path / 'queue.db'), '--seed', server.search_url,
+                '--base-url', server.base_url, '--max-rate', '10000', '--download-rate', '10000',
+                '--output', str(tmp_path)]
+        assert main(argv) == 1
+        assert len(list((tmp_path / 'pdfs').glob('*.pdf'))) == 4
@@ -0,0 +1,55 @@
+"""PDF下载：独立的下载限速预算和断点续传"""
+import time
+
+import pytest
+
+from benchmark import StandInCABServer, synthetic_doi, synthetic_pdf
+from crawler import Article, CABDigitalLibraryCrawler
+
+
+def make_articles(server, count):
+    return [Article(title=f'Article {n}', doi=synthetic_doi(n),
+                    pdf_url=f"{server.base_url}/doi/pdf/{synthetic_doi(n)}") for n in range(count)]
+
+
+def test_concurrent_downloads_follow_download_rate(tmp_path):
+    count, rate = 8, 4.0
+    with StandInCABServer(pdf_size=4096) as server:
+        # 搜索页的预算很小，不应拖慢PDF下载
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=0.1, download_rate=rate)
+        started = time.monotonic()
+        result = crawler.download_all_pdfs(make_articles(server, count), tmp_path, max_concurrent=5)
+        elapsed = time.monotonic() - started
+
+    assert result == {'success': count, 'failed': 0}
+    # 第一个请求不等待，其余按下载速率依次放行（间隔带±20%抖动）
+    expected = (count - 1) / rate
+    assert expected * 0.6 < elapsed < expected * 1.6
+
+
+@pytest.mark.parametrize('validator', ['"stale-etag"', None])
+def test_stale_part_file_is_not_spliced(tmp_path, validator):
+    with StandInCABServer(pdf_size=64 * 1024) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, download_rate=10000)
+        # 上次中断时留下的是另一个版本的PDF的前30KB
+        (tmp_path / 'x.pdf.part').write_bytes(synthetic_pdf(80 * 1024)[:30 * 1024])
+        if validator:
+            (tmp_path / 'x.pdf.part.validator').write_text(validator, encoding='utf-8')
+        assert crawler.download_pdf(f"{server.base_url}/doi/pdf/x", tmp_path, 'x.pdf')
+        expected = server.pdf
+
+    assert (tmp_path / 'x.pdf').read_bytes() == expected
+    assert not (tmp_path / 'x.pdf.part').exists()
+    assert not (tmp_path / 'x.pdf.part.validator').exists()
+
+
+def test_part_file_resumes_when_validator_matches(tmp_path):
+    with StandInCABServer(pdf_size=64 * 1024) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, download_rate=10000)
+        (tmp_path / 'x.pdf.part').write_bytes(server.pdf[:30 * 1024])
+        (tmp_path / 'x.pdf.part.validator').write_text(server.pdf_etag, encoding='utf-8')
+        assert crawler.download_pdf(f"{server.base_url}/doi/pdf/x", tmp_path, 'x.pdf')
+        expected = server.pdf
+
+    assert (tmp_path / 'x.pdf').read_bytes() == expected
+    assert crawler.metrics.counters['bytes_downloaded'] == len(expected) - 30 * 1024
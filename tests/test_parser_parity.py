@@ -0,0 +1,42 @@
+"""各HTML解析后端对保存的搜索结果页应提取出完全一致的字段"""
+from pathlib import Path
+
+import pytest
+
+from crawler import ARTICLE_FIELDS, CABDigitalLibraryCrawler, PARSER_BACKENDS
+
+FIXTURE_DIR = Path(__file__).parent / 'fixtures' / 'search_pages'
+BACKEND_MODULES = {'html.parser': 'bs4', 'lxml': 'lxml', 'selectolax': 'selectolax'}
+
+
+def extract(html, backend):
+    crawler = CABDigitalLibraryCrawler(parser_backend=backend)
+    doc = crawler._parse_html(html)
+    articles = [{key: article[key] for key in ARTICLE_FIELDS} for article in crawler._extract_articles_from_page(doc)]
+    return articles, crawler._has_next_page(doc), crawler._extract_total_results(doc)
+
+
+@pytest.fixture(scope='module')
+def reference():
+    pytest.importorskip('bs4')
+    return {page.name: extract(page.read_text(encoding='utf-8'), 'html.parser')
+            for page in sorted(FIXTURE_DIR.glob('*.html'))}
+
+
+def test_fixtures_cover_expected_fields(reference):
+    (first, first_next, first_total), (last, last_next, last_total) = reference.values()
+    assert [len(first), len(last)] == [4, 3]
+    assert (first_next, last_next) == (True, False)
+    assert first_total == last_total == 7
+    assert first[0]['doi'] == '10.31220/agriRxiv.2024.00245'
+    assert first[0]['authors'] == 'Chinedu Okafor, Jürgen Müller, Wei Zhang'
+    assert first[0]['publication_date'] == '14 March 2024'
+    assert first[0]['journal'] == 'agriRxiv'
+    assert first[3]['doi'] == ''
+
+
+@pytest.mark.parametrize('backend', [b for b in PARSER_BACKENDS if b != 'html.parser'])
+def test_backend_matches_html_parser(reference, backend):
+    pytest.importorskip(BACKEND_MODULES[backend])
+    for name, expected in reference.items():
+        assert extract((FIXTURE_DIR / name).read_text(encoding='utf-8'), backend) == expected, name
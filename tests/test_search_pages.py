@@ -0,0 +1,75 @@
+"""搜索结果页解析和翻页的测试"""
+import pytest
+
+from benchmark import StandInCABServer, synthetic_search_page
+from crawler import CABDigitalLibraryCrawler, HTTPCache, SEARCH_PAGE_SIZE
+
+
+@pytest.mark.parametrize('html, expected', [
+    ('<div class="search-result__meta"><span class="result__count">1 - 20 of 1,234 results</span></div>', 1234),
+    ('<div class="search-result__meta"><span class="result__count">1,234</span> results</div>', 1234),
+    ('<div class="search-result__meta"><span class="result__count">Showing 41-60</span></div>', 60),
+    ('<p>Found 2,048 results for "soil"</p>', 2048),
+    ('<p>No count here</p>', None),
+])
+def test_extract_total_results(html, expected):
+    crawler = CABDigitalLibraryCrawler(parser_backend='html.parser')
+    assert crawler._extract_total_results(crawler._parse_html(f'<html><body>{html}</body></html>')) == expected
+
+
+def test_parallel_falls_back_to_serial_without_total(tmp_path):
+    total = 2 * SEARCH_PAGE_SIZE + 5
+    for index, start in enumerate(range(0, total, SEARCH_PAGE_SIZE)):
+        page = synthetic_search_page(start, total)
+        # 去掉总结果数，模拟页面改版后无法读取
+        page = page.replace(f'<span class="result__count">{total}</span> results', '')
+        (tmp_path / f'{index:03d}.html').write_text(page, encoding='utf-8')
+
+    with StandInCABServer(pages_dir=tmp_path) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser')
+        pages = list(crawler.iter_search_pages(server.search_url, parallel=True))
+
+    assert [len(items) for items in pages] == [SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE, 5]
+    assert len({a['doi'] for items in pages for a in items}) == total
+
+
+def test_parallel_pages_replay_from_http_cache(tmp_path):
+    total = 5 * SEARCH_PAGE_SIZE
+    with StandInCABServer(total_results=total) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser',
+                                           http_cache=HTTPCache(tmp_path / 'cache'))
+        live = crawler.get_search_results(server.search_url, parallel=True, max_workers=3)
+        search_url = server.search_url
+        base_url = server.base_url
+
+    # 服务已关闭，离线回放时并行翻页的工作线程会话也必须从缓存读取
+    replay = CABDigitalLibraryCrawler(base_url=base_url, max_rate=10000, parser_backend='html.parser',
+                                      http_cache=HTTPCache(tmp_path / 'cache', offline=True))
+    replayed = replay.get_search_results(search_url, parallel=True, max_workers=3)
+    assert len(live) == total
+    assert [a['doi'] for a in replayed] == [a['doi'] for a in live]
+    assert replay.metrics.counters.get('cache_hits') == 5
+
+
+def test_incremental_queries_share_run_start(tmp_path):
+    total = 3 * SEARCH_PAGE_SIZE
+    with StandInCABServer(total_results=total) as server:
+        # 替身服务忽略检索条件，两个搜索返回相同的文章
+        urls = [server.search_url, server.search_url.replace('agrirxiv', 'cabireviews')]
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser',
+                                           state_db=tmp_path / 'state.db')
+        pages = list(crawler._iter_query_pages(urls, incremental=True, max_workers=1))
+
+    # 第二个搜索不会把第一个搜索本次提交的文章当作旧文章而在第1页停止
+    assert crawler.metrics.counters['pages'] == 6
+    assert sum(len(items) for items in pages) == total
+
+
+def test_parallel_pages_ignored_for_multiple_queries(tmp_path, caplog):
+    with StandInCABServer(total_results=SEARCH_PAGE_SIZE + 5) as server:
+        urls = [server.search_url, server.search_url.replace('agrirxiv', 'cabireviews')]
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser')
+        result = crawler.crawl_and_download(urls, tmp_path, download_pdfs=False, parallel_pages=True)
+
+    assert result['articles'] == SEARCH_PAGE_SIZE + 5
+    assert any('忽略并行翻页选项' in record.getMessage() for record in caplog.records)
@@ -0,0 +1,118 @@
+"""本地替身服务上的摘要增强（/v1/chat/completions）和批量引文导出（/action/downloadCitation）"""
+import hashlib
+import importlib.util
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from benchmark import StandInCABServer, synthetic_abstract, synthetic_doi
+from crawler import AbstractEnricher, CABDigitalLibraryCrawler, CrawlMetrics
+
+
+class APIStatusError(Exception):
+    """与openai.APIStatusError一致，带有status_code和response属性"""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.status_code = response.status_code
+        self.response = response
+
+
+class RequestsChatClient:
+    """没有安装openai时使用的最小兼容客户端，只实现chat.completions.create"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        response = requests.post(f"{self.base_url}/chat/completions", json=request, timeout=10)
+        if not response.ok:
+            raise APIStatusError(response)
+        data = response.json()
+        message = SimpleNamespace(**data['choices'][0]['message'])
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(**data['usage']))
+
+
+@pytest.fixture(params=['openai', 'requests'])
+def make_enricher(request, tmp_path):
+    if request.param == 'openai' and importlib.util.find_spec('openai') is None:
+        pytest.skip('openai未安装')
+
+    def make(server, **kwargs):
+        enricher = AbstractEnricher(tmp_path / 'enrich.db', base_url=f"{server.base_url}/v1", api_key='test',
+                                    metrics=CrawlMetrics(), **kwargs)
+        if request.param == 'requests':
+            enricher._client = RequestsChatClient(enricher.base_url)
+        return enricher
+
+    return make
+
+
+def test_enrichment_retries_429_then_hits_cache(make_enricher):
+    articles = [{'doi': synthetic_doi(n), 'abstract': synthetic_abstract(n)} for n in range(5)]
+    with StandInCABServer() as server:
+        server.chat_failures = 2
+        enricher = make_enricher(server, batch_size=5, max_concurrent=1, max_retries=3)
+        results = enricher.enrich(articles)
+        assert server.chat_requests == 3
+        assert enricher.metrics.counters['enrich_retries'] == 2
+        assert set(results) == {a['doi'] for a in articles}
+        assert results[articles[0]['doi']]['category'] == 'Soil science'
+        enricher.conn.close()
+
+        # 再次运行时全部命中缓存，不再发送请求
+        rerun = make_enricher(server, batch_size=5)
+        assert rerun.enrich(articles) == results
+        assert server.chat_requests == 3
+        assert rerun.metrics.counters['enrich_cache_hits'] == 5
+        rerun.conn.close()
+
+
+def test_enrichment_gives_up_after_max_retries(make_enricher):
+    articles = [{'doi': synthetic_doi(0), 'abstract': synthetic_abstract(0)}]
+    with StandInCABServer() as server:
+        server.chat_failures = 10
+        enricher = make_enricher(server, max_retries=1)
+        assert enricher.enrich(articles) == {}
+        assert server.chat_requests == 2
+        assert enricher.metrics.counters['enrich_failed'] == 1
+        enricher.conn.close()
+
+
+def test_citation_export_fills_metadata():
+    total = 45
+    with StandInCABServer(total_results=total) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser',
+                                           abstract_max_chars=100)
+        articles = crawler.get_search_results(server.search_url)
+        assert all(not a['volume'] and len(a['abstract']) == 100 for a in articles)
+
+        assert crawler.enrich_from_citations(articles, batch_size=20) == total
+        assert server.citation_requests == 3
+
+    n = 7
+    article = next(a for a in articles if a['doi'] == synthetic_doi(n))
+    assert article['abstract'] == synthetic_abstract(n)
+    assert (article['volume'], article['issue']) == ('2024', str(n % 12 + 1))
+    assert article['pages'] == f'{n * 10 + 1}-{n * 10 + 9}'
+
+
+def test_crawl_enriches_full_abstracts(make_enricher, tmp_path):
+    total = 5
+    with StandInCABServer(total_results=total) as server:
+        crawler = CABDigitalLibraryCrawler(base_url=server.base_url, max_rate=10000, parser_backend='html.parser',
+                                           abstract_max_chars=100)
+        crawler.enricher = make_enricher(server)
+        crawler.crawl_and_download(server.search_url, tmp_path, download_pdfs=False, enrich=True)
+        # 摘要增强自动启用引文导出，总结和缓存的是完整摘要而不是截断到100字符的摘要
+        assert server.citation_requests == 1
+        cached = dict(crawler.enricher.conn.execute("SELECT doi, abstract_hash FROM enrichments"))
+        crawler.enricher.conn.close()
+
+    assert cached == {synthetic_doi(n): hashlib.sha256(synthetic_abstract(n).encode('utf-8')).hexdigest()[:16]
+                      for n in range(total)}
+    results = (tmp_path / 'articles_enrichment.jsonl').read_text(encoding='utf-8').splitlines()
+    assert {json.loads(line)['doi'] for line in results} == set(cached)
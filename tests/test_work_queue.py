@@ -0,0 +1,103 @@
+"""租约式工作队列：并发领取、租约过期后重新领取和失败任务"""
+import threading
+import time
+from urllib.parse import parse_qs
+
+from benchmark import StandInCABServer, synthetic_search_page
+from crawler import WorkQueue, main
+
+
+def test_concurrent_claims_are_exclusive(tmp_path):
+    db_path = tmp_path / 'queue.db'
+    queue = WorkQueue(db_path)
+    for n in range(60):
+        queue.enqueue('download' if n % 3 else 'page', str(n), {'n': n})
+
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(owner):
+        # 每个线程使用独立连接，与多个节点共用一个数据库文件的情形相同
+        node_queue = WorkQueue(db_path)
+        while True:
+            task = node_queue.claim(owner)
+            if task is None:
+                break
+            with lock:
+                claimed.append((task['kind'], task['key']))
+            assert node_queue.complete(task, owner)
+        node_queue.close()
+
+    threads = [threading.Thread(target=worker, args=(f'node-{n}',)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == len(set(claimed)) == 60
+    # 页面任务优先领取
+    assert all(kind == 'page' for kind, _ in claimed[:5])
+    assert queue.counts() == {'page': {'done': 20}, 'download': {'done': 40}}
+    assert queue.is_drained()
+    queue.close()
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(tmp_path / 'queue.db', lease_seconds=0.1)
+    queue.enqueue('page', 'a', {})
+    task = queue.claim('crashed-node')
+    assert queue.claim('other-node') is None
+    assert not queue.is_drained()
+
+    time.sleep(0.15)
+    retry = queue.claim('other-node')
+    assert (retry['id'], retry['attempts']) == (task['id'], 2)
+    # 原节点的租约已被接手，不能再标记完成
+    assert not queue.complete(task, 'crashed-node')
+    assert queue.complete(retry, 'other-node')
+    assert queue.counts()['page'] == {'done': 1}
+    queue.close()
+
+
+def test_max_attempts_marks_task_failed(tmp_path):
+    queue = WorkQueue(tmp_path / 'queue.db', lease_seconds=0.1, max_attempts=2)
+    queue.enqueue('download', 'released', {})
+    queue.enqueue('download', 'expired', {})
+
+    for _ in range(2):
+        task = queue.claim('node')
+        assert task['key'] == 'released'
+        queue.release(task, 'node')
+    for _ in range(2):
+        task = queue.claim('node')
+        assert task['key'] == 'expired'
+        time.sleep(0.15)  # 节点崩溃，租约过期
+
+    assert queue.claim('node') is None
+    assert queue.counts()['download'] == {'failed': 2}
+    assert queue.is_drained()
+    queue.close()
+
+
+def test_worker_refuses_export_after_failed_page(tmp_path):
+    total = 45
+
+    def search_page(handler, url):
+        start = int(parse_qs(url.query).get('startPage', ['0'])[0])
+        if start == 20:
+            handler.send_response(404)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+        handler.send_body(synthetic_search_page(start, total).encode('utf-8'), 'text/html; charset=utf-8')
+
+    with StandInCABServer(total_results=total) as server:
+        server.add_route('/action/doSearch', search_page)
+        argv = ['worker', '--queue', str(tmp_path / 'queue.db'), '--seed', server.search_url, '--no-pdfs',
+                '--export', '--base-url', server.base_url, '--max-rate', '10000', '--output', str(tmp_path)]
+        assert main(argv) == 1
+
+    assert not (tmp_path / 'articles_info.json').exists()
+    queue = WorkQueue(tmp_path / 'queue.db')
+    assert queue.counts()['page'] == {'done': 2, 'failed': 1}
+    queue.close()